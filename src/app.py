@@ -7,16 +7,22 @@ a vector store, and enables question-answering based on the document content usi
 
 import os
 import time
-import socket
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
 
 from document_loader import load_txt, load_pdf, load_docx, load_odt
 from scan_folders import scan_folders
+from utils import is_streamlit_cloud
 from vector_store import (
-    chunk_text,
+    chunk_texts,
     create_collection,
     add_chunks,
     create_file_index_chunk,
+    file_fingerprint,
+    existing_fingerprints,
+    BATCH_SIZE,
+    CHUNK_BATCH_SIZE,
 )
 
 from response_generator import set_llm, generate_answer, set_langchain_history
@@ -25,6 +31,18 @@ from retrieval_system import query_documents
 # Map file extensions to their respective loader functions
 loaders = {".txt": load_txt, ".pdf": load_pdf, ".docx": load_docx, ".odt": load_odt}
 
+# Number of threads used to load documents concurrently
+LOADER_WORKERS = min(8, os.cpu_count() or 1)
+
+# Maximum number of documents loading or loaded but not yet handed over
+MAX_PENDING_LOADS = 2 * LOADER_WORKERS
+
+# Directory holding one extraction directory per uploaded ZIP, next to the vector store
+ZIP_EXTRACT_PATH = "./vectordb/zips"
+
+# Number of most recent chat messages shown as chat bubbles; older ones are collapsed
+VISIBLE_MESSAGES = 20
+
 
 # ============================================================================
 # Helper Functions
@@ -40,32 +58,6 @@ loaders = {".txt": load_txt, ".pdf": load_pdf, ".docx": load_docx, ".odt": load_
 #    st.json(streamlit_vars)
 
 
-def is_streamlit_cloud():
-    """
-    Detect if running on Streamlit Community Cloud (2025+).
-    Uses domain and environment heuristics.
-    """
-    # 1️⃣ Check for Streamlit Cloud domain name in known URLs
-    server_url = os.getenv("STREAMLIT_SERVER_ROOT_URL", "")
-    if "streamlit.app" in server_url:
-        return True
-
-    # 2️⃣ Check hostname (useful on Streamlit Cloud's container)
-    try:
-        hostname = socket.gethostname()
-        if "streamlit" in hostname:
-            return True
-    except Exception:
-        pass
-
-    # 3️⃣ Last resort: check if running inside container with Streamlit Cloud pattern
-    env_keys = " ".join(os.environ.keys()).lower()
-    if "streamlit" in env_keys and "server" in env_keys:
-        # Optional: You can also check for PORT 8501 (default Cloud port)
-        return True
-
-    return False
-
 # Uncomment below conditional expression to detect if you are running on Streamlit Cloud or Local
 #st.write("☁️ Detected environment:", "Streamlit Cloud" if is_streamlit_cloud() else "Local")
 
@@ -82,28 +74,182 @@ def is_streamlit_cloud():
 
 def extract_zip_and_scan(uploaded_zip):
     """
-    Extract uploaded ZIP file to temporary directory and scan for documents.
+    Extract uploaded ZIP file to temporary directory, streaming extracted documents.
+
+    Members are decompressed in parallel by a pool of threads, each with its own
+    handle on the archive, and handed over through a queue, so documents can be
+    loaded and embedded while the rest of the archive is still being decompressed.
+
+    The directory is created under ZIP_EXTRACT_PATH and named after a hash of the ZIP
+    content. Uploading the same ZIP again reuses the extracted files once every member
+    was written, so their paths, fingerprints and cached embeddings match and
+    incremental indexing skips them.
 
     Args:
         uploaded_zip: Streamlit UploadedFile object containing ZIP data.
 
     Returns:
-        tuple: (temp_dir_path, list of file paths)
+        tuple: (temp_dir_path, number of files in the ZIP, iterator of extracted file paths)
     """
-    import tempfile
+    import hashlib
+    import io
+    import queue
+    import shutil
+    import threading
     import zipfile
 
-    # Create temporary directory
-    temp_dir = tempfile.mkdtemp()
+    data = uploaded_zip.getvalue()
+
+    # Create a directory that is the same for every upload of this ZIP
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    temp_dir = os.path.join(ZIP_EXTRACT_PATH, digest)
+    os.makedirs(temp_dir, exist_ok=True)
+    root = os.path.realpath(temp_dir)
+    complete_marker = os.path.join(root, ".extraction-complete")
+
+    with zipfile.ZipFile(io.BytesIO(data), "r") as zip_ref:
+        members = [info for info in zip_ref.infolist() if not info.is_dir()]
+
+    def member_target(info):
+        # Entries that would be written outside the temporary directory are skipped
+        target = os.path.realpath(os.path.join(root, info.filename))
+        return target if target.startswith(root + os.sep) else None
+
+    if os.path.exists(complete_marker):
+        # Extracted by an earlier upload of the same ZIP
+        targets = [
+            target for target in map(member_target, members) if target and os.path.exists(target)
+        ]
+        return temp_dir, len(targets), iter(targets)
+
+    extracted = queue.Queue()
+
+    # ZipFile objects are not safe to share between threads, so each worker opens its own
+    local = threading.local()
+
+    def extract_member(info):
+        if not hasattr(local, "zip_ref"):
+            local.zip_ref = zipfile.ZipFile(io.BytesIO(data), "r")
+
+        target = member_target(info)
+        if target is None:
+            return True
+
+        # Write to a temporary name first so a file is never seen half-written, even
+        # when another session is extracting the same ZIP
+        partial = f"{target}.part-{threading.get_ident()}"
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with local.zip_ref.open(info) as source, open(partial, "wb") as destination:
+                shutil.copyfileobj(source, destination)
+            os.replace(partial, target)
+        except Exception:
+            print(f"Could not extract {info.filename} from the ZIP file. Skipping.")
+            if os.path.exists(partial):
+                os.remove(partial)
+            return False
+        extracted.put(target)
+        return True
+
+    def extract_members():
+        # None marks the end of the stream, also when extraction fails midway
+        try:
+            with ThreadPoolExecutor(max_workers=LOADER_WORKERS) as executor:
+                complete = all(list(executor.map(extract_member, members)))
+            # Later uploads of the same ZIP reuse the extracted files, but only if none are missing
+            if complete:
+                with open(complete_marker, "w"):
+                    pass
+        finally:
+            extracted.put(None)
+
+    threading.Thread(target=extract_members, daemon=True).start()
+
+    return temp_dir, len(members), iter(extracted.get, None)
+
+
+def load_documents(files, known_fingerprints=frozenset()):
+    """
+    Load documents in worker threads, yielding each one as soon as it is loaded.
+
+    Files may be a lazy iterable (e.g. a ZIP being extracted); each file is submitted
+    for loading as soon as it arrives, with at most MAX_PENDING_LOADS documents held
+    at a time. Unsupported files are reported and yielded
+    with empty content. Files whose fingerprint is already indexed are not loaded
+    and are yielded with None content.
+
+    Args:
+        files (iterable): File paths to load.
+        known_fingerprints (set): Fingerprints of files already in the vector store.
+
+    Yields:
+        tuple: (file path, fingerprint, text content)
+    """
+    with ThreadPoolExecutor(max_workers=LOADER_WORKERS) as executor:
+        futures = {}
+        for file in files:
+            fingerprint = file_fingerprint(file)
+            if fingerprint in known_fingerprints:
+                yield file, fingerprint, None
+                continue
+
+            # One extension lookup per file; extensions match case-insensitively
+            loader = loaders.get(os.path.splitext(file)[1].lower())
+            if loader is None:
+                st.write(f"File {file} not supported. Skipping.")
+                yield file, fingerprint, ""
+                continue
+
+            futures[executor.submit(loader, file)] = (file, fingerprint)
+
+            # Hand over documents that finished loading while more files are still arriving
+            for future in [future for future in futures if future.done()]:
+                yield *futures.pop(future), future.result()
+
+            # Wait for a document before submitting more once too many are held
+            if len(futures) >= MAX_PENDING_LOADS:
+                future = next(as_completed(futures))
+                yield *futures.pop(future), future.result()
+
+        # Pop each document as it is handed over so its text can be freed once indexed
+        for future in as_completed(list(futures)):
+            yield *futures.pop(future), future.result()
+
+
+def needs_indexing():
+    """
+    Check whether the selected documents still have to be (re)indexed.
+
+    Returns:
+        bool: True before the first indexing and after a folder or ZIP is (re)loaded.
+    """
+    return "collection" not in st.session_state or st.session_state.get("reindex", False)
+
+
+@st.cache_data(show_spinner=False)
+def scan_documents(folder_path, mtime_key):
+    """
+    Scan a folder for documents, cached across reruns and sessions.
+
+    Args:
+        folder_path (str): Folder to scan.
+        mtime_key (float): Folder modification time; a new value invalidates the cache.
+
+    Returns:
+        list: File paths found in the folder and its subdirectories.
+    """
+    return scan_folders(folder_path)
 
-    # Extract ZIP to temp directory
-    with zipfile.ZipFile(uploaded_zip, "r") as zip_ref:
-        zip_ref.extractall(temp_dir)
 
-    # Scan the extracted folder for documents
-    files = scan_folders(temp_dir)
+@st.cache_resource(show_spinner=False)
+def get_llm():
+    """
+    Create the language model client once per process and share it across sessions.
 
-    return temp_dir, files
+    Returns:
+        GoogleGenerativeAI: Configured LLM instance.
+    """
+    return set_llm()
 
 
 def render_sidebar():
@@ -115,7 +261,11 @@ def render_sidebar():
     - Local mode: Folder path input for direct filesystem access
 
     Also provides chat history clearing functionality.
+
+    Returns:
+        Placeholder for the number of indexed files, or None when no documents are selected.
     """
+    files_status = None
 
     with st.sidebar:
         st.title("📁 Document Settings")
@@ -131,9 +281,8 @@ def render_sidebar():
             if uploaded_zip is not None:
                 if st.button("Load ZIP", use_container_width=True):
                     st.session_state.uploaded_zip = uploaded_zip
-                    # Clear collection to trigger re-indexing
-                    if "collection" in st.session_state:
-                        del st.session_state.collection
+                    # Trigger incremental re-indexing; unchanged files are skipped
+                    st.session_state.reindex = True
                     if "files" in st.session_state:
                         del st.session_state.files
                     st.rerun()
@@ -144,8 +293,9 @@ def render_sidebar():
                 st.success("📦 **ZIP Uploaded:**")
                 st.code(st.session_state.uploaded_zip.name, language=None)
 
+                files_status = st.empty()
                 if "files" in st.session_state:
-                    st.info(f"📄 **Files Indexed:** {len(st.session_state.files)}")
+                    files_status.info(f"📄 **Files Indexed:** {len(st.session_state.files)}")
         else:
             # Local mode: Direct folder path access
             # Input field for folder path
@@ -158,9 +308,11 @@ def render_sidebar():
             if st.button("Load Folder", use_container_width=True):
                 if folder_path and os.path.exists(folder_path):
                     st.session_state.folder_path = folder_path
-                    # Clear collection to trigger re-indexing
-                    if "collection" in st.session_state:
-                        del st.session_state.collection
+                    # The cache key only notices files added or removed directly in the folder,
+                    # so rescan from scratch to pick up changes in subfolders
+                    scan_documents.clear()
+                    # Trigger incremental re-indexing; unchanged files are skipped
+                    st.session_state.reindex = True
                     if "files" in st.session_state:
                         del st.session_state.files
                     st.rerun()
@@ -180,8 +332,9 @@ def render_sidebar():
                 st.code(st.session_state.folder_path, language=None, wrap_lines=True)
 
                 # Show number of files if available
+                files_status = st.empty()
                 if "files" in st.session_state:
-                    st.info(f"📄 **Files Indexed:** {len(st.session_state.files)}")
+                    files_status.info(f"📄 **Files Indexed:** {len(st.session_state.files)}")
 
         # Clear chat button
         st.markdown("---")
@@ -189,50 +342,119 @@ def render_sidebar():
             st.session_state.messages = []
             st.rerun()
 
+    return files_status
+
 
-def initialize_vector_store(folder_path, files):
+def initialize_vector_store(folder_path, files, total=None):
     """
     Initialize and populate the vector store with document chunks.
 
+    Indexing is incremental: files whose path, modification time and size match
+    what is already stored are skipped, changed files are re-indexed and chunks
+    of files that no longer exist are removed.
+
     Args:
         folder_path (str): Path to the folder containing documents.
-        files (list): List of file paths to process and index.
+        files (iterable): File paths to process and index; may be produced lazily.
+        total (int): Number of files, used for the progress bar. Defaults to len(files).
     """
-    if "collection" not in st.session_state:
-        try:
-            collection = create_collection(folder_path)
-        except Exception:
-            st.write("Error setting up the document storage system.")
-            st.stop()
+    if needs_indexing():
+        ss = st.session_state
+
+        # Reuse the open collection when reloading the same folder
+        if "collection" in ss and ss.get("collection_path") == folder_path:
+            collection = ss.collection
+        else:
+            try:
+                collection = create_collection(folder_path)
+            except Exception:
+                st.write("Error setting up the document storage system.")
+                st.stop()
+
+        if total is None:
+            total = len(files)
 
         with st.spinner("Indexing documents..."):
-            # Create progress bar
+            # Create progress bar, updated about 100 times rather than once per file
             progress_bar = st.progress(0)
+            progress_every = max(1, total // 100)
 
-            # Process each document file
-            for i, file in enumerate(files):
-                # Show progress
-                progress_bar.progress((i + 1) / len(files))
-                _, extension = os.path.splitext(file)
-
-                # Load document content using the appropriate loader
-                try:
-                    fn = loaders[extension]
-                    content = fn(file)
-                except KeyError:
-                    content = ""
-                    st.write(f"File {file} not supported. Skipping.")
-
-                # Split content into chunks and add to vector store
-                chunks = chunk_text(content, file)
+            try:
+                known_fingerprints = existing_fingerprints(collection)
+            except Exception:
+                known_fingerprints = set()
+            known_sources = {source for source, _, _ in known_fingerprints}
+
+            # Loaded documents are chunked in batches, and chunks are embedded in batches
+            pending_documents = []
+            pending_chunks = []
+            indexed_files = []
+            current_sources = set()
+            # Changed files whose old chunks must go before their new chunks are added
+            changed_sources = []
+
+            def flush_chunks(collection, chunks):
+                # Drop outdated chunks of changed files in one call, then add the new ones
+                if changed_sources:
+                    try:
+                        collection.delete(where={"source": {"$in": changed_sources}})
+                    except Exception:
+                        st.write("Error removing outdated chunks of changed files.")
+                    changed_sources.clear()
                 if chunks:
                     try:
                         collection = add_chunks(chunks, collection)
                     except Exception:
-                        st.write(f"Error processing file {file}. Skipping.")
+                        st.write("Error processing a batch of documents. Skipping.")
+                return collection
+
+            # Documents are loaded in worker threads while the main thread chunks and embeds them
+            for i, (file, fingerprint, content) in enumerate(
+                load_documents(files, known_fingerprints)
+            ):
+                # Show progress
+                if (i + 1) % progress_every == 0 or i + 1 == total:
+                    progress_bar.progress(min(1.0, (i + 1) / total))
+                indexed_files.append(file)
+                current_sources.add(fingerprint[0])
+
+                # Unchanged since the last indexing
+                if content is None:
+                    continue
+
+                # Changed file: its old chunks are dropped before the next batch is added
+                if fingerprint[0] in known_sources:
+                    changed_sources.append(fingerprint[0])
+
+                # Split documents into chunks in bulk and flush to vector store once the batch is full
+                pending_documents.append((content, file, fingerprint))
+                if len(pending_documents) >= CHUNK_BATCH_SIZE:
+                    texts, sources, fingerprints = zip(*pending_documents)
+                    pending_chunks.extend(chunk_texts(texts, sources, fingerprints))
+                    pending_documents = []
+                if len(pending_chunks) >= BATCH_SIZE:
+                    collection = flush_chunks(collection, pending_chunks)
+                    pending_chunks = []
+
+            # Flush remaining documents and chunks
+            if pending_documents:
+                texts, sources, fingerprints = zip(*pending_documents)
+                pending_chunks.extend(chunk_texts(texts, sources, fingerprints))
+            if pending_chunks or changed_sources:
+                collection = flush_chunks(collection, pending_chunks)
+
+            # Remove chunks of files that were deleted since the last indexing, in one call
+            deleted_sources = sorted(known_sources - current_sources)
+            if deleted_sources:
+                try:
+                    collection.delete(where={"source": {"$in": deleted_sources}})
+                except Exception:
+                    st.write("Error removing chunks of deleted files.")
 
             # Create and add a special index of all file names for better retrieval
-            file_index = create_file_index_chunk(files)
+            # Sorted so the index text does not depend on loading order
+            indexed_files.sort()
+            file_index = create_file_index_chunk(indexed_files)
             try:
                 collection = add_chunks(file_index, collection)
             except Exception:
@@ -240,11 +462,48 @@ def initialize_vector_store(folder_path, files):
                     "Warning: Could not index file names. You can still search document content."
                 )
 
-            st.session_state.collection = collection
-            # Reload page after indexing
-            st.rerun()
-    else:
-        collection = st.session_state.collection
+            ss.files = indexed_files
+            ss.collection = collection
+            ss.collection_path = folder_path
+            ss.reindex = False
+            # Clear the progress bar and continue to the chat instead of rerunning the script
+            progress_bar.empty()
+
+
+@st.fragment
+def render_chat(collection, llm):
+    """
+    Render the chat history and input as a fragment.
+
+    Sending a message reruns only this fragment, not the whole script, so folder
+    scanning, indexing checks and the sidebar are skipped on every chat turn. Only the
+    last VISIBLE_MESSAGES messages get their own chat bubble; earlier ones are joined
+    into a single markdown block inside a collapsed expander.
+
+    Args:
+        collection: ChromaDB collection containing indexed documents.
+        llm: Language model instance for generating answers.
+    """
+    messages = st.session_state.messages
+    earlier = messages[:-VISIBLE_MESSAGES]
+
+    # Display older chat history as one element instead of one bubble per message
+    if earlier:
+        with st.expander(f"Earlier messages ({len(earlier)})", expanded=False):
+            st.markdown(
+                "\n\n---\n\n".join(
+                    f"**{message['role'].capitalize()}:** {message['content']}"
+                    for message in earlier
+                )
+            )
+
+    # Display recent chat history
+    for message in messages[-VISIBLE_MESSAGES:]:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    # Handle new user input
+    handle_chat_input(collection, llm)
 
 
 def handle_chat_input(collection, llm):
@@ -290,11 +549,13 @@ st.title("Chat with your documents!")
 st.write(time.strftime("%d %b, %Y"))
 
 # Sidebar
-render_sidebar()
+files_status = render_sidebar()
 
 if "folder_path" in st.session_state:
     # Local mode: Scan the folder for supported document files
-    files = scan_folders(st.session_state.folder_path)
+    folder_path = st.session_state.folder_path
+    mtime_key = os.path.getmtime(folder_path) if os.path.isdir(folder_path) else 0.0
+    files = scan_documents(folder_path, mtime_key)
     if not files:
         if "show_popup" not in st.session_state:
             st.session_state.show_popup = True
@@ -303,14 +564,18 @@ if "folder_path" in st.session_state:
         st.stop()
 
     st.session_state.files = files
+    total = len(files)
 elif "uploaded_zip" in st.session_state:
-    # Cloud mode: extract ZIP and scan
-    temp_dir, files = extract_zip_and_scan(st.session_state.uploaded_zip)
-    if not files:
-        st.info("No documents found in ZIP")
-        st.stop()
-    st.session_state.files = files
-    st.session_state.temp_dir = temp_dir
+    # Cloud mode: extract the ZIP only when it needs indexing, streaming files as they are written
+    if not needs_indexing():
+        files = st.session_state.files
+        total = len(files)
+    else:
+        temp_dir, total, files = extract_zip_and_scan(st.session_state.uploaded_zip)
+        if not total:
+            st.info("No documents found in ZIP")
+            st.stop()
+        st.session_state.temp_dir = temp_dir
 else:
     st.stop()
 
@@ -325,24 +590,20 @@ if is_streamlit_cloud():
 else:
     collection_path = st.session_state.folder_path
 
-initialize_vector_store(collection_path, st.session_state.files)
+initialize_vector_store(collection_path, files, total)
+
+# The sidebar was drawn before indexing, so fill in the final file count now
+if files_status is not None:
+    files_status.info(f"📄 **Files Indexed:** {len(st.session_state.files)}")
 
 # ============================================================================
 # Chat Interface and Question Answering
 # ============================================================================
 
 # Initialize LLM and conversation history
-if "llm" not in st.session_state:
-    st.session_state.llm = set_llm()
-llm = st.session_state.llm
+llm = get_llm()
 
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-# Display existing chat history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-
-# Handle new user input
-handle_chat_input(st.session_state.collection, llm)
+render_chat(st.session_state.collection, llm)
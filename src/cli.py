@@ -6,14 +6,19 @@ Scans a directory for documents, indexes them in a vector store, and enables con
 import os
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from document_loader import load_txt, load_pdf, load_docx, load_odt
 from scan_folders import scan_folders
 from vector_store import (
-    chunk_text,
+    chunk_texts,
     create_collection,
     add_chunks,
     create_file_index_chunk,
+    file_fingerprint,
+    existing_fingerprints,
+    BATCH_SIZE,
+    CHUNK_BATCH_SIZE,
 )
 from response_generator import set_llm, generate_answer, set_history
 from retrieval_system import query_documents
@@ -21,6 +26,38 @@ from retrieval_system import query_documents
 # Map file extensions to loader functions
 loaders = {".txt": load_txt, ".pdf": load_pdf, ".docx": load_docx, ".odt": load_odt}
 
+# Number of threads used to load documents concurrently
+LOADER_WORKERS = min(8, os.cpu_count() or 1)
+
+# Maximum number of documents loading or loaded but not yet indexed
+MAX_PENDING_LOADS = 2 * LOADER_WORKERS
+
+
+def load_documents(executor, documents):
+    """
+    Load documents in worker threads, yielding each one as soon as it is loaded.
+
+    At most MAX_PENDING_LOADS documents are held at a time; further files are only
+    submitted once a loaded document has been handed over.
+
+    Args:
+        executor (ThreadPoolExecutor): Pool running the loaders.
+        documents (dict): Maps each file path to its (loader, fingerprint).
+
+    Yields:
+        tuple: (text content, file path, fingerprint)
+    """
+    futures = {}
+    for file, (loader, fingerprint) in documents.items():
+        futures[executor.submit(loader, file)] = (file, fingerprint)
+        if len(futures) >= MAX_PENDING_LOADS:
+            future = next(as_completed(futures))
+            yield future.result(), *futures.pop(future)
+
+    for future in as_completed(list(futures)):
+        yield future.result(), *futures.pop(future)
+
+
 # Get directory from user input with validation
 directory = input("Enter directory to scan (default: data): ").strip()
 if not directory:
@@ -45,25 +82,66 @@ except Exception:
     print("Error setting up the document storage system.")
     sys.exit(1)
 
-# Load and index each document into the vector store
+# Fingerprints of files already indexed by a previous run
+try:
+    known_fingerprints = existing_fingerprints(collection)
+except Exception:
+    known_fingerprints = set()
+known_sources = {source for source, _, _ in known_fingerprints}
+
+# Report unsupported file types up front; only new or changed files with a known loader are loaded
+supported = {}
+current_sources = set()
 for file in files:
-    name, extension = os.path.splitext(file)
-    try:
-        fn = loaders[extension]
-        content = fn(file)
-    except KeyError:
-        # Skip unsupported file types
-        content = ""
+    fingerprint = file_fingerprint(file)
+    current_sources.add(fingerprint[0])
+    if fingerprint in known_fingerprints:
+        # Unchanged since the last run
+        continue
+    # One extension lookup per file; extensions match case-insensitively
+    loader = loaders.get(os.path.splitext(file)[1].lower())
+    if loader is not None:
+        supported[file] = (loader, fingerprint)
+    else:
         print(f"File {file} not supported. Skipping.")
 
-    chunks = chunk_text(content, file)
-    if chunks:
-        try:
-            collection = add_chunks(chunks, collection)
-        except Exception:
-            # skip problematic files and continue indexing others
-            print(f"Error processing file {file}. Skipping.")
-            continue
+# Remove chunks of changed files (re-added below) and of files that no longer exist
+changed_sources = {fingerprint[0] for _, fingerprint in supported.values()}
+stale_sources = sorted((known_sources - current_sources) | (known_sources & changed_sources))
+if stale_sources:
+    try:
+        collection.delete(where={"source": {"$in": stale_sources}})
+    except Exception:
+        print("Error removing outdated chunks.")
+
+# Load documents in worker threads and index them into the vector store as they complete
+# Loaded documents are chunked in batches, and chunks are embedded in batches
+pending_documents = []
+pending_chunks = []
+with ThreadPoolExecutor(max_workers=LOADER_WORKERS) as executor:
+    for document in load_documents(executor, supported):
+        pending_documents.append(document)
+        if len(pending_documents) >= CHUNK_BATCH_SIZE:
+            texts, sources, fingerprints = zip(*pending_documents)
+            pending_chunks.extend(chunk_texts(texts, sources, fingerprints))
+            pending_documents = []
+        if len(pending_chunks) >= BATCH_SIZE:
+            try:
+                collection = add_chunks(pending_chunks, collection)
+            except Exception:
+                # skip problematic batches and continue indexing others
+                print("Error processing a batch of documents. Skipping.")
+            pending_chunks = []
+
+# Flush remaining documents and chunks
+if pending_documents:
+    texts, sources, fingerprints = zip(*pending_documents)
+    pending_chunks.extend(chunk_texts(texts, sources, fingerprints))
+if pending_chunks:
+    try:
+        collection = add_chunks(pending_chunks, collection)
+    except Exception:
+        print("Error processing a batch of documents. Skipping.")
 
 # Create and add file index chunk (provides LLM with list of available documents)
 file_index = create_file_index_chunk(files)
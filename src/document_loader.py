@@ -1,8 +1,27 @@
+import mmap
+import os
+from contextlib import contextmanager
+
 from pypdf import PdfReader
 from docx import Document
 from odf.opendocument import load
 from odf import text, teletype
 
+# Files larger than this are memory-mapped, so the OS pages them in on demand
+# instead of the loader copying the whole file into memory first
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+@contextmanager
+def _open_binary(filepath):
+    """Open a file for binary reading, as a read-only memory map when it is larger than MMAP_THRESHOLD."""
+    with open(filepath, "rb") as file:
+        if os.fstat(file.fileno()).st_size <= MMAP_THRESHOLD:
+            yield file
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
 
 def load_txt(filepath):
     """
@@ -15,8 +34,17 @@ def load_txt(filepath):
         str: The full text content of the file
     """
     try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            return file.read()
+        if os.path.getsize(filepath) <= MMAP_THRESHOLD:
+            with open(filepath, "r", encoding="utf-8") as file:
+                return file.read()
+
+        # Decode straight from the mapped pages rather than reading the bytes first
+        with _open_binary(filepath) as mapped:
+            content = str(mapped, "utf-8")
+        # Match text-mode reading, which translates Windows and old Mac line endings
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return content
     except FileNotFoundError:
         print("The file does not exist. Please check the path or select another file.")
     except PermissionError:
@@ -37,8 +65,11 @@ def load_pdf(filepath):
         str: The extracted text content from all pages
     """
     try:
-        reader = PdfReader(filepath)
-        content = "\n".join(page.extract_text() or "" for page in reader.pages)
+        # Read from the open file (or its memory map) instead of letting pypdf
+        # copy the whole file into memory; pages must be extracted before it closes
+        with _open_binary(filepath) as source:
+            reader = PdfReader(source)
+            content = "\n".join(page.extract_text() or "" for page in reader.pages)
         return content
     except FileNotFoundError:
         print("The file does not exist. Please check the path or select another file.")
@@ -0,0 +1,155 @@
+"""
+Persistent cache of chunk embeddings keyed by embedding model and chunk text.
+
+Embeddings are stored as float32 bytes in a SQLite database so unchanged chunks are not
+re-embedded when the same documents are indexed again. The database keeps at most
+MAX_ENTRIES embeddings, dropping the oldest writes first. A bounded in-memory LRU layer
+sits in front of the database for repeated lookups within a session.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Location of the SQLite database, next to the ChromaDB files
+CACHE_PATH = "./vectordb/embedding_cache.sqlite3"
+
+# Maximum number of embeddings kept in the database (about 1.5 KB each for 384 dimensions)
+MAX_ENTRIES = 200_000
+
+# Maximum number of embeddings kept in memory
+MEMORY_CACHE_SIZE = 4096
+
+# Maximum number of keys per SQLite "IN" query
+_QUERY_BATCH = 500
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def cache_key(model_name, text):
+    """
+    Build the cache key for a chunk of text embedded with a given model.
+
+    Args:
+        model_name (str): Name of the embedding model.
+        text (str): The text that was embedded.
+
+    Returns:
+        str: SHA-256 hex digest of the model name and text.
+    """
+    return hashlib.sha256(f"{model_name}:{text}".encode()).hexdigest()
+
+
+def _connect(path):
+    """Open the cache database, creating the file and table if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+    )
+    return connection
+
+
+def _remember(path, key, vector):
+    """Store an embedding in the in-memory LRU layer, evicting the oldest entry if full."""
+    _memory[(path, key)] = vector
+    _memory.move_to_end((path, key))
+    if len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+def get_embeddings(model_name, texts, path=None):
+    """
+    Look up cached embeddings for a list of texts.
+
+    Args:
+        model_name (str): Name of the embedding model.
+        texts (list[str]): Texts to look up.
+        path (str): Cache database path. Defaults to CACHE_PATH.
+
+    Returns:
+        list: One float32 numpy array per text, or None where the text is not cached.
+    """
+    path = path or CACHE_PATH
+    keys = [cache_key(model_name, text) for text in texts]
+    results = [None] * len(texts)
+
+    # Serve what we can from memory first
+    missing = {}
+    with _lock:
+        for i, key in enumerate(keys):
+            vector = _memory.get((path, key))
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                _memory.move_to_end((path, key))
+                results[i] = vector
+
+    if not missing:
+        return results
+
+    # Fall back to the database for the remaining keys
+    connection = _connect(path)
+    try:
+        pending = list(missing)
+        for start in range(0, len(pending), _QUERY_BATCH):
+            batch = pending[start : start + _QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                batch,
+            ).fetchall()
+
+            with _lock:
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    _remember(path, key, vector)
+                    for i in missing[key]:
+                        results[i] = vector
+    finally:
+        connection.close()
+
+    return results
+
+
+def put_embeddings(model_name, texts, embeddings, path=None):
+    """
+    Store embeddings for a list of texts, evicting the oldest ones beyond MAX_ENTRIES.
+
+    Args:
+        model_name (str): Name of the embedding model.
+        texts (list[str]): Texts that were embedded.
+        embeddings (list): One embedding vector per text.
+        path (str): Cache database path. Defaults to CACHE_PATH.
+    """
+    path = path or CACHE_PATH
+    rows = []
+    with _lock:
+        for text, embedding in zip(texts, embeddings):
+            key = cache_key(model_name, text)
+            vector = np.asarray(embedding, dtype=np.float32)
+            _remember(path, key, vector)
+            rows.append((key, vector.tobytes()))
+
+    connection = _connect(path)
+    try:
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows
+            )
+            # Rowids grow with every write (a replaced row gets a new one), so rows more
+            # than MAX_ENTRIES writes old are the oldest entries
+            connection.execute(
+                "DELETE FROM embeddings WHERE rowid <= (SELECT MAX(rowid) FROM embeddings) - ?",
+                (MAX_ENTRIES,),
+            )
+    finally:
+        connection.close()
@@ -10,6 +10,31 @@ from langchain_core.messages import AIMessage, HumanMessage
 load_dotenv(override=True)
 
 
+def read_int_setting(name, default):
+    """
+    Read a non-negative integer setting from the environment.
+
+    Args:
+        name (str): Name of the environment variable.
+        default (int): Value used when the variable is unset or not a valid integer.
+
+    Returns:
+        int: The configured value, or default.
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return max(0, int(value))
+    except ValueError:
+        print(f"{name} must be a whole number, got {value!r}. Using {default}.")
+        return default
+
+
+# Most recent chat messages sent to the LLM with each question (0 sends the full history)
+HISTORY_MAX_MESSAGES = read_int_setting("HISTORY_MAX_MESSAGES", 20)
+
+
 def set_llm():
     """
     Initialize and configure the Google Generative AI language model.
@@ -41,6 +66,7 @@ def generate_answer(llm, user_input, chunks, history):
         user_input (str): The user's question or input text.
         chunks: Retrieved document chunks relevant to the query.
         history (list): List of previous chat messages (HumanMessage and AIMessage objects).
+            Only the last HISTORY_MAX_MESSAGES are sent, keeping the prompt bounded in long sessions.
 
     Returns:
         str: The generated answer from the LLM.
@@ -62,6 +88,9 @@ def generate_answer(llm, user_input, chunks, history):
 
     chain = prompt | llm | StrOutputParser()
 
+    if HISTORY_MAX_MESSAGES > 0:
+        history = history[-HISTORY_MAX_MESSAGES:]
+
     try:
         answer = chain.invoke(
             {"user_input": user_input, "chunks": chunks, "history": history}
@@ -1,3 +1,28 @@
+from functools import lru_cache
+
+import numpy as np
+
+from vector_store import EMBEDDING_MODEL, get_embedding_function
+
+
+@lru_cache(maxsize=512)
+def _embed_query(model_name, text):
+    """
+    Embed a query string, caching the result per embedding model and exact text.
+
+    Args:
+        model_name (str): Name of the embedding model, part of the cache key so a
+            different model never reuses stale vectors.
+        text (str): The query text.
+
+    Returns:
+        np.ndarray: Read-only float32 query embedding.
+    """
+    vector = np.asarray(get_embedding_function()([text])[0], dtype=np.float32)
+    vector.setflags(write=False)
+    return vector
+
+
 def query_documents(collection, query_text, n_results=5):
     """
     Query the vector database for relevant document chunks.
@@ -10,5 +35,6 @@ def query_documents(collection, query_text, n_results=5):
     Returns:
         dict: Query results with documents, metadatas, and distances
     """
-    results = collection.query(query_texts=[query_text], n_results=n_results)
+    query_embedding = _embed_query(EMBEDDING_MODEL, query_text)
+    results = collection.query(query_embeddings=[query_embedding], n_results=n_results)
     return results
@@ -1,4 +1,7 @@
+import os
 import re
+import socket
+from functools import lru_cache
 
 
 def sanitize_filename(filename: str) -> str:
@@ -61,3 +64,34 @@ def sanitize_filename(filename: str) -> str:
 
     # Add back leading dot if present
     return leading_dot + result
+
+
+@lru_cache(maxsize=1)
+def is_streamlit_cloud():
+    """
+    Detect if running on Streamlit Community Cloud (2025+).
+    Uses domain and environment heuristics.
+    The environment does not change while the process runs, so the result is cached.
+    It lives here rather than in app.py because Streamlit re-executes app.py on every
+    rerun, which would create a new, empty cache each time.
+    """
+    # 1️⃣ Check for Streamlit Cloud domain name in known URLs
+    server_url = os.getenv("STREAMLIT_SERVER_ROOT_URL", "")
+    if "streamlit.app" in server_url:
+        return True
+
+    # 2️⃣ Check hostname (useful on Streamlit Cloud's container)
+    try:
+        hostname = socket.gethostname()
+        if "streamlit" in hostname:
+            return True
+    except Exception:
+        pass
+
+    # 3️⃣ Last resort: check if running inside container with Streamlit Cloud pattern
+    env_keys = " ".join(os.environ.keys()).lower()
+    if "streamlit" in env_keys and "server" in env_keys:
+        # Optional: You can also check for PORT 8501 (default Cloud port)
+        return True
+
+    return False
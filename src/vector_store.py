@@ -1,62 +1,792 @@
 import chromadb
 import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import onnxruntime
+from filelock import FileLock
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+from tokenizers import Tokenizer, models
+from tokenizers.pre_tokenizers import BertPreTokenizer
+
+try:
+    import faiss
+except ImportError:  # Optional, only needed for VSTORE_BACKEND=faiss
+    faiss = None
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
+from embedding_cache import get_embeddings, put_embeddings
 from utils import sanitize_filename
 
+# Let the Rust tokenizer split batch encodes across cores; read when it is first used
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+# Embedding model used for chunks; same model as ChromaDB's default embedding function
+EMBEDDING_MODEL = ONNXMiniLM_L6_V2.MODEL_NAME
+
+# ONNX Runtime execution providers preferred over the CPU for the embedding model, fastest first
+GPU_PROVIDERS = (
+    "TensorrtExecutionProvider",
+    "CUDAExecutionProvider",
+    "ROCMExecutionProvider",
+    "DmlExecutionProvider",
+)
+
+# Number of chunks accumulated before a single add_chunks call.
+# One large upsert lets the embedding function run one batched pass instead of one per file.
+BATCH_SIZE = 256
+
+# Chunk window and overlap, in tokens. For typical prose a window stays inside the
+# embedding model's 256 word-piece limit, leaving room for the source prefix.
+CHUNK_TOKENS = 128
+CHUNK_OVERLAP = 32
+
+# Hard cap on the characters in one window. Tokens are split on whitespace and
+# punctuation only, so text without either (long URLs, identifiers, languages written
+# without spaces) would otherwise form a single token of any length. Dense text can
+# still exceed the word-piece limit, but the part the model truncates stays small and
+# the chunk added to the LLM prompt stays bounded.
+CHUNK_MAX_CHARS = 800
+
+# Number of loaded documents chunked together in one chunk_texts call
+CHUNK_BATCH_SIZE = 32
+
+# Directory holding one store directory per in-memory collection, next to the ChromaDB files
+MEMORY_STORE_PATH = "./vectordb/memory"
+
+# Open in-memory stores by path, shared by every session in the process
+_memory_stores = {}
+_memory_stores_lock = threading.Lock()
+
+# Rows of int8 codes widened to float32 at a time when scoring quantized embeddings
+_INT8_BLOCK_ROWS = 4096
+
+# Rust tokenizer splitting words and punctuation like the embedding model. Only token
+# offsets are used, so a one-entry vocabulary keeps it usable without a model download.
+_tokenizer = Tokenizer(models.WordLevel({"[UNK]": 0}, unk_token="[UNK]"))
+_tokenizer.pre_tokenizer = BertPreTokenizer()
+
+# Splitter for the file index chunk, built once at import
+_file_index_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=500,
+    chunk_overlap=50,
+    separators=["\n\n", "\n", " ", ""],
+)
+
+
+def file_fingerprint(file):
+    """
+    Identify the current version of a file without reading its content.
+
+    Args:
+        file (str): Path to the file.
+
+    Returns:
+        tuple: (normalized path, modification time in ns, size in bytes); (path, 0, 0)
+        if the file cannot be read.
+    """
+    normalized_file = file.replace("\\", "/")
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return normalized_file, 0, 0
+    return normalized_file, stat.st_mtime_ns, stat.st_size
+
+
+def existing_fingerprints(collection):
+    """
+    Read the file fingerprints recorded in a collection's chunk metadata.
+
+    Sources that have chunks without a fingerprint (indexed before fingerprints were
+    recorded, or the file index chunk) or chunks with different fingerprints get the
+    fingerprint (source, None, None). It matches no file, so these sources are treated
+    as changed: their chunks are deleted and the file is indexed again.
+
+    Args:
+        collection: Vector store collection.
+
+    Returns:
+        set[tuple]: (source, mtime_ns, size) for every source with indexed chunks.
+    """
+    metadatas = collection.get(include=["metadatas"])["metadatas"]
+    fingerprints = {}
+    for metadata in metadatas:
+        if not metadata or "source" not in metadata:
+            continue
+        fingerprint = (metadata["source"], metadata.get("mtime_ns"), metadata.get("size"))
+        if fingerprints.setdefault(fingerprint[0], fingerprint) != fingerprint:
+            fingerprints[fingerprint[0]] = (fingerprint[0], None, None)
+    return set(fingerprints.values())
+
+
+def _window_spans(offsets):
+    """
+    Compute character spans of overlapping token windows.
+
+    A window ends after CHUNK_TOKENS tokens or CHUNK_MAX_CHARS characters, whichever
+    comes first. Tokens longer than CHUNK_MAX_CHARS are split into pieces beforehand.
+    Windows cut short by the character cap overlap by the same fraction of their tokens.
+
+    Args:
+        offsets (list[tuple]): (start, end) character offsets of each token.
+
+    Returns:
+        np.ndarray: (windows, 2) array of (start, end) character positions.
+    """
+    if len(offsets) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    offsets = np.asarray(offsets, dtype=np.int64)
+    starts, ends = offsets[:, 0], offsets[:, 1]
+
+    # Split oversized tokens into pieces of at most CHUNK_MAX_CHARS characters
+    pieces = np.maximum(-(-(ends - starts) // CHUNK_MAX_CHARS), 1)
+    if pieces.max() > 1:
+        piece_index = np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+        starts = np.repeat(starts, pieces) + piece_index * CHUNK_MAX_CHARS
+        ends = np.minimum(starts + CHUNK_MAX_CHARS, np.repeat(ends, pieces))
 
-def chunk_text(text, file):
+    # Number of tokens ending within CHUNK_MAX_CHARS of each token's start
+    char_limits = np.searchsorted(ends, starts + CHUNK_MAX_CHARS, side="right")
+
+    count = len(starts)
+    spans = []
+    first = 0
+    while True:
+        last = min(first + CHUNK_TOKENS, int(char_limits[first]))
+        spans.append((starts[first], ends[last - 1]))
+        if last >= count:
+            break
+        first = last - (last - first) * CHUNK_OVERLAP // CHUNK_TOKENS
+    return np.array(spans, dtype=np.int64)
+
+
+def chunk_texts(texts, files, fingerprints=None):
+    """
+    Split several texts into chunks with metadata for vector storage.
+
+    All texts are tokenized in one batch call, which the Rust tokenizer spreads across
+    CPU cores. Chunks are overlapping windows of at most CHUNK_TOKENS tokens and
+    CHUNK_MAX_CHARS characters, sliced from the original text by character offsets so
+    no decoding is needed.
+
+    Args:
+        texts (list[str]): The text contents to be split into chunks.
+        files (list[str]): The source file path of each text, stored in metadata.
+        fingerprints (list[tuple]): Optional file_fingerprint result per text, stored in
+            metadata so unchanged files can be skipped when the folder is indexed again.
+
+    Returns:
+        list[Document]: Document objects for all texts, in input order.
+    """
+    if fingerprints is None:
+        fingerprints = [None] * len(texts)
+
+    encodings = _tokenizer.encode_batch(list(texts), add_special_tokens=False)
+
+    docs = []
+    for text, file, fingerprint, encoding in zip(texts, files, fingerprints, encodings):
+        # Normalize path to use forward slashes for cross-platform compatibility
+        normalized_file = file.replace("\\", "/")
+
+        file_metadata = {"source": normalized_file}
+        if fingerprint is not None:
+            file_metadata["mtime_ns"] = fingerprint[1]
+            file_metadata["size"] = fingerprint[2]
+
+        docs.extend(
+            Document(
+                page_content=f"[Source: {normalized_file}]\n\n{text[start:end]}",
+                metadata={**file_metadata, "chunk": index},
+            )
+            for index, (start, end) in enumerate(_window_spans(encoding.offsets).tolist())
+        )
+
+    return docs
+
+
+def chunk_text(text, file, fingerprint=None):
     """
     Split text into smaller chunks with metadata for vector storage.
 
     Args:
         text (str): The text content to be split into chunks.
         file (str): The source file path to be stored in metadata.
+        fingerprint (tuple): Optional result of file_fingerprint, stored in metadata so
+            unchanged files can be skipped when the folder is indexed again.
 
     Returns:
         list[Document]: List of Document objects containing chunked text with metadata.
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50,
-        separators=["\n\n", "\n", " ", ""],
-    )
+    return chunk_texts([text], [file], [fingerprint])
 
-    chunks = splitter.split_text(text)
 
-    # Normalize path to use forward slashes for cross-platform compatibility
-    normalized_file = file.replace("\\", "/")
+def _normalize(vectors):
+    """Return a C-contiguous float32 copy of vectors with each row scaled to unit length."""
+    vectors = np.array(vectors, dtype=np.float32, order="C", ndmin=2)
+    # Row norms without materializing the squared matrix, then scale in place
+    norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+    norms[norms == 0] = 1.0
+    vectors /= norms[:, np.newaxis]
+    return vectors
 
-    docs = [
-        Document(
-            page_content=f"[Source: {normalized_file}]\n\n{content}",
-            metadata={"source": normalized_file, "chunk": index},
+
+def _select_top_k(scores, k):
+    """Return (scores, positions) of the k highest scores per row, highest first."""
+    n = scores.shape[1]
+    if k < n:
+        # Select the k largest in place of negating the whole score array
+        top = np.argpartition(scores, n - k, axis=1)[:, n - k :]
+    else:
+        top = np.broadcast_to(np.arange(n), scores.shape)
+
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(top_scores, axis=1)[:, ::-1]
+    return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+
+def top_k_cosine(matrix, queries, k):
+    """
+    Find the k rows of matrix most similar to each query.
+
+    Both inputs must be L2-normalized float32, so one matrix product gives cosine
+    similarity for every row at once and only the top k are sorted.
+
+    Args:
+        matrix (np.ndarray): (N, d) stored embeddings.
+        queries (np.ndarray): (Q, d) query embeddings.
+        k (int): Number of results per query, at most N.
+
+    Returns:
+        tuple: (scores, positions), each (Q, k), ordered from most to least similar.
+    """
+    return _select_top_k(queries @ matrix.T, k)
+
+
+def quantize_int8(vectors):
+    """
+    Quantize embeddings to int8 with one scale per vector.
+
+    Args:
+        vectors (np.ndarray): (N, d) float32 embeddings.
+
+    Returns:
+        tuple: (codes, scales) where codes is (N, d) int8 and vectors ~= codes / scales[:, None].
+    """
+    peaks = np.abs(vectors).max(axis=1)
+    peaks[peaks == 0] = 1.0
+    scales = (127.0 / peaks).astype(np.float32)
+    codes = np.round(vectors * scales[:, np.newaxis]).astype(np.int8)
+    return codes, scales
+
+
+def top_k_cosine_int8(codes, scales, queries, k):
+    """
+    Find the k int8-quantized rows most similar to each float32 query.
+
+    Codes are widened to float32 one block at a time, so only a cache-sized slice
+    is ever held at full precision while the store stays at one byte per dimension.
+
+    Args:
+        codes (np.ndarray): (N, d) int8 codes from quantize_int8.
+        scales (np.ndarray): (N,) per-vector scales from quantize_int8.
+        queries (np.ndarray): (Q, d) L2-normalized query embeddings.
+        k (int): Number of results per query, at most N.
+
+    Returns:
+        tuple: (scores, positions), each (Q, k), ordered from most to least similar.
+    """
+    scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+    for start in range(0, len(codes), _INT8_BLOCK_ROWS):
+        block = codes[start : start + _INT8_BLOCK_ROWS].astype(np.float32)
+        scores[:, start : start + len(block)] = queries @ block.T
+    scores /= scales
+    return _select_top_k(scores, k)
+
+
+class _MemoryBackend:
+    """
+    Shared bookkeeping for in-memory vector stores.
+
+    Implements the subset of the ChromaDB collection API used by this app (upsert,
+    query, get, delete, count) so subclasses can be returned from create_collection. Vectors are
+    L2-normalized, so inner product is cosine similarity and distances are
+    reported as 1 - cosine similarity. Subclasses store and search the vectors.
+
+    When path is set the store is persisted in that directory: emb.f32 holds the
+    normalized float32 embeddings as one contiguous (N, d) array, entries.jsonl one
+    line of ID, document and metadata per row, and meta.json the row count N, the
+    dimension d and the rows that were deleted. New rows are appended and deletions
+    only update meta.json; the files are compacted once deleted rows outnumber live
+    ones. Reopening memory-maps emb.f32 instead of deserializing the vectors.
+    Entries are JSON Lines rather than a columnar format such as parquet because chunk
+    metadata is free-form with no fixed schema, and appending a batch must not rewrite
+    the rows already stored.
+
+    Writes hold a lock file in the store directory and first reload the store if
+    meta.json was changed by another handle, so several processes can share a store.
+    Within one process, create_collection hands out a single instance per path, and
+    each instance serializes its own calls across threads.
+    Subclasses set their own attributes before calling __init__, which loads the store.
+    """
+
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self._positions = {}
+        self._dim = None
+        # Row in the store files of each entry, and number of rows in the files
+        self._file_rows = np.empty(0, dtype=np.int64)
+        self._file_count = 0
+        # Contents of meta.json as last read or written by this instance
+        self._meta = None
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(os.path.join(path, "store.lock")) if path else None
+        if path and os.path.isdir(path):
+            with self._file_lock:
+                self._load()
+
+    def count(self):
+        """Return the number of stored chunks."""
+        return len(self.ids)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        """Add chunks, replacing any existing chunks with the same IDs."""
+        with self._lock, self._writing():
+            self._upsert(ids, embeddings, documents, metadatas)
+
+    def _upsert(self, ids, embeddings, documents, metadatas):
+        vectors = _normalize(embeddings)
+
+        replaced = [self._positions[id_] for id_ in ids if id_ in self._positions]
+        if replaced:
+            self._remove_positions(replaced)
+
+        self._add_vectors(vectors)
+        for id_ in ids:
+            self._positions[id_] = len(self.ids)
+            self.ids.append(id_)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        self._dim = vectors.shape[1]
+
+        if self.path:
+            self._append_to_store(vectors, ids, documents, metadatas)
+
+    def get(self, include=None):
+        """Return the IDs and metadata of every stored chunk."""
+        with self._lock:
+            return {"ids": list(self.ids), "metadatas": list(self.metadatas)}
+
+    def delete(self, where):
+        """
+        Remove chunks whose metadata matches every condition in where.
+
+        A condition is either a value the key must equal or {"$in": values}, as in ChromaDB.
+        """
+        conditions = [
+            (key, set(value["$in"]) if isinstance(value, dict) else {value})
+            for key, value in where.items()
+        ]
+        with self._lock, self._writing():
+            positions = [
+                p
+                for p, metadata in enumerate(self.metadatas)
+                if all(metadata.get(key) in values for key, values in conditions)
+            ]
+            if positions:
+                self._remove_positions(positions)
+
+    def query(self, query_embeddings, n_results=10):
+        """Return the closest chunks for each query embedding in ChromaDB's result format."""
+        with self._lock:
+            return self._query(query_embeddings, n_results)
+
+    def _query(self, query_embeddings, n_results):
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        k = min(n_results, self.count())
+        if k == 0:
+            for key in results:
+                results[key] = [[] for _ in query_embeddings]
+            return results
+
+        scores, positions = self._search(_normalize(query_embeddings), k)
+        for row_scores, row_positions in zip(scores, positions):
+            results["ids"].append([self.ids[p] for p in row_positions])
+            results["documents"].append([self.documents[p] for p in row_positions])
+            results["metadatas"].append([self.metadatas[p] for p in row_positions])
+            results["distances"].append([float(1 - score) for score in row_scores])
+        return results
+
+    def _remove_positions(self, positions):
+        """Drop entries at the given positions, keeping vectors and lists aligned."""
+        self._remove_vectors(positions)
+        removed = set(positions)
+        keep = [p for p in range(len(self.ids)) if p not in removed]
+        self.ids = [self.ids[p] for p in keep]
+        self.documents = [self.documents[p] for p in keep]
+        self.metadatas = [self.metadatas[p] for p in keep]
+        self._positions = {id_: p for p, id_ in enumerate(self.ids)}
+        if self.path:
+            self._file_rows = np.delete(self._file_rows, positions)
+            if self._file_count - len(self._file_rows) > len(self._file_rows):
+                self._compact_store()
+            else:
+                self._write_meta()
+
+    def _store_file(self, filename):
+        return os.path.join(self.path, filename)
+
+    @contextmanager
+    def _writing(self):
+        """Hold the store's lock file, reloading the store if another handle changed it."""
+        if not self.path:
+            yield
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        with self._file_lock:
+            if self._read_meta() != self._meta:
+                self._reload()
+            yield
+
+    def _read_meta(self):
+        meta_file = self._store_file("meta.json")
+        if not os.path.exists(meta_file):
+            return None
+        with open(meta_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _reload(self):
+        """Drop the in-memory entries and read the store files again."""
+        self.ids = []
+        self.documents = []
+        self.metadatas = []
+        self._positions = {}
+        self._file_rows = np.empty(0, dtype=np.int64)
+        self._file_count = 0
+        self._clear_vectors()
+        self._load()
+
+    def _load(self):
+        """Restore the entries persisted under path, if any."""
+        count = 0
+        deleted = []
+        self._meta = self._read_meta()
+        if self._meta is not None:
+            count, self._dim = self._meta["count"], self._meta["dim"]
+            deleted = self._meta["deleted"]
+
+        # Rows past count belong to an interrupted write. Cut them off so the next
+        # append lands right after the last valid row.
+        lines = []
+        entries_file = self._store_file("entries.jsonl")
+        if os.path.exists(entries_file):
+            with open(entries_file, "rb") as f:
+                lines = [line for _, line in zip(range(count), f)]
+            os.truncate(entries_file, sum(len(line) for line in lines))
+        emb_file = self._store_file("emb.f32")
+        if os.path.exists(emb_file):
+            os.truncate(emb_file, count * (self._dim or 0) * 4)
+
+        self._file_count = count
+        self._file_rows = np.setdiff1d(np.arange(count, dtype=np.int64), deleted)
+        if len(self._file_rows) == 0:
+            return
+
+        vectors = np.memmap(emb_file, dtype=np.float32, mode="c", shape=(count, self._dim))
+        if len(self._file_rows) < count:
+            vectors = np.asarray(vectors[self._file_rows])
+        self._load_vectors(vectors)
+
+        for row in self._file_rows.tolist():
+            entry = json.loads(lines[row])
+            self._positions[entry["id"]] = len(self.ids)
+            self.ids.append(entry["id"])
+            self.documents.append(entry["document"])
+            self.metadatas.append(entry["metadata"])
+
+    def _load_vectors(self, vectors):
+        """Take over vectors read from the store; subclasses may keep the memory map."""
+        self._add_vectors(vectors)
+
+    def _append_to_store(self, vectors, ids, documents, metadatas):
+        """Append new rows to the store files, then record the new row count."""
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._store_file("emb.f32"), "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self._store_file("entries.jsonl"), "a", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps({"id": id_, "document": document, "metadata": metadata}) + "\n"
+                for id_, document, metadata in zip(ids, documents, metadatas)
+            )
+
+        new_rows = np.arange(self._file_count, self._file_count + len(ids), dtype=np.int64)
+        self._file_rows = np.concatenate((self._file_rows, new_rows))
+        self._file_count += len(ids)
+        self._write_meta()
+
+    def _compact_store(self):
+        """Rewrite the store files with only the live rows."""
+        emb_file = self._store_file("emb.f32")
+        stored = np.memmap(
+            emb_file, dtype=np.float32, mode="r", shape=(self._file_count, self._dim)
         )
-        for index, content in enumerate(chunks)
-    ]
+        kept = stored[self._file_rows]
+        del stored
+        kept.tofile(emb_file + ".tmp")
+        os.replace(emb_file + ".tmp", emb_file)
 
-    return docs
+        entries_file = self._store_file("entries.jsonl")
+        with open(entries_file + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps({"id": id_, "document": document, "metadata": metadata}) + "\n"
+                for id_, document, metadata in zip(self.ids, self.documents, self.metadatas)
+            )
+        os.replace(entries_file + ".tmp", entries_file)
+
+        self._file_count = self.count()
+        self._file_rows = np.arange(self._file_count, dtype=np.int64)
+        self._write_meta()
+
+    def _write_meta(self):
+        deleted = np.setdiff1d(np.arange(self._file_count, dtype=np.int64), self._file_rows)
+        self._meta = {"count": self._file_count, "dim": self._dim, "deleted": deleted.tolist()}
+        meta_file = self._store_file("meta.json")
+        with open(meta_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._meta, f)
+        os.replace(meta_file + ".tmp", meta_file)
+
+
+class NumpyBackend(_MemoryBackend):
+    """
+    In-memory vector store doing exact search with a single numpy matrix product.
+
+    Embeddings live in one contiguous (N, d) matrix that grows by doubling, so adding
+    a batch does not copy the whole store. With quantize=True the matrix holds int8
+    codes plus one float32 scale per row, a quarter of the float32 memory. A float32
+    store reopened from disk is searched directly through its memory map.
+    """
+
+    def __init__(self, name, quantize=False, path=None):
+        self.quantize = quantize
+        self._buffer = None
+        self._scale_buffer = None
+        self.matrix = None
+        self.scales = None
+        super().__init__(name, path)
+
+    def _clear_vectors(self):
+        self._buffer = None
+        self._scale_buffer = None
+        self.matrix = None
+        self.scales = None
+
+    def _load_vectors(self, vectors):
+        if self.quantize:
+            super()._load_vectors(vectors)
+            return
+
+        # Pages of the store file are read on first use; nothing is copied up front.
+        # The first add or removal copies the rows into an ordinary buffer.
+        self._buffer = vectors
+        self._scale_buffer = np.ones(len(vectors), dtype=np.float32)
+        self._set_size(len(vectors))
+
+    def _add_vectors(self, vectors):
+        if self.quantize:
+            vectors, scales = quantize_int8(vectors)
+        else:
+            scales = np.ones(len(vectors), dtype=np.float32)
+
+        size = self.count()
+        if self._buffer is None:
+            capacity = max(len(vectors), 1024)
+            self._buffer = np.empty((capacity, vectors.shape[1]), dtype=vectors.dtype)
+            self._scale_buffer = np.empty(capacity, dtype=np.float32)
+        elif size + len(vectors) > len(self._buffer):
+            capacity = max(2 * len(self._buffer), size + len(vectors))
+            buffer = np.empty((capacity, self._buffer.shape[1]), dtype=self._buffer.dtype)
+            buffer[:size] = self._buffer[:size]
+            scale_buffer = np.empty(capacity, dtype=np.float32)
+            scale_buffer[:size] = self._scale_buffer[:size]
+            self._buffer, self._scale_buffer = buffer, scale_buffer
+
+        self._buffer[size : size + len(vectors)] = vectors
+        self._scale_buffer[size : size + len(vectors)] = scales
+        self._set_size(size + len(vectors))
+
+    def _remove_vectors(self, positions):
+        if isinstance(self._buffer, np.memmap):
+            # Release the store file before it is rewritten
+            self._buffer = np.array(self._buffer)
+        kept = np.delete(self.matrix, positions, axis=0)
+        self._buffer[: len(kept)] = kept
+        self._scale_buffer[: len(kept)] = np.delete(self.scales, positions)
+        self._set_size(len(kept))
+
+    def _set_size(self, size):
+        self.matrix = self._buffer[:size]
+        self.scales = self._scale_buffer[:size]
+
+    def _search(self, queries, k):
+        if self.quantize:
+            return top_k_cosine_int8(self.matrix, self.scales, queries, k)
+        return top_k_cosine(self.matrix, queries, k)
+
+
+class FaissBackend(_MemoryBackend):
+    """
+    In-memory vector store backed by an exact FAISS inner-product index.
+
+    With quantize=True the index stores 8-bit scalar-quantized codes, a quarter of
+    the float32 memory; queries stay float32.
+    """
+
+    def __init__(self, name, quantize=False, path=None):
+        if faiss is None:
+            raise ImportError(
+                "VSTORE_BACKEND=faiss requires faiss. Install it with `pip install faiss-cpu`."
+            )
+        self.quantize = quantize
+        self.index = None
+        super().__init__(name, path)
+
+    def _clear_vectors(self):
+        self.index = None
+
+    def _add_vectors(self, vectors):
+        if self.index is None:
+            self.index = self._create_index(vectors.shape[1])
+        self.index.add(vectors)
+
+    def _create_index(self, dim):
+        if not self.quantize:
+            return faiss.IndexFlatIP(dim)
+
+        index = faiss.IndexScalarQuantizer(
+            dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+        # Normalized components lie in [-1, 1]; training on the bounds fixes that range
+        # for every dimension so later batches are never clipped
+        index.train(np.array([[-1.0] * dim, [1.0] * dim], dtype=np.float32))
+        return index
+
+    def _remove_vectors(self, positions):
+        # Flat indexes compact remaining vectors in order, like the metadata lists
+        self.index.remove_ids(np.asarray(positions, dtype=np.int64))
+
+    def _search(self, queries, k):
+        return self.index.search(queries, k)
 
 
 def create_collection(path):
     """
-    Create or retrieve a ChromaDB collection for document storage.
+    Create or retrieve a vector store collection for document storage.
+
+    The backend is chosen with the VSTORE_BACKEND environment variable:
+    "chroma" (default) for a persistent ChromaDB collection, "faiss" for an
+    in-memory exact FAISS index, or "numpy" for an in-memory exact search without
+    extra dependencies. The in-memory backends avoid HNSW insertion cost for small corpora.
+    They store int8-quantized embeddings unless VSTORE_PRECISION is set to "fp32", and
+    are persisted under MEMORY_STORE_PATH so later sessions reopen them from disk.
+    Sessions opening the same path share one in-memory store.
 
     Returns:
-        chromadb.Collection: The ChromaDB collection named after the sanitized path.
+        chromadb.Collection | FaissBackend | NumpyBackend: The collection named after the sanitized path.
     """
     name = sanitize_filename(path)
+    backend = os.getenv("VSTORE_BACKEND", "chroma").lower()
+    quantize = os.getenv("VSTORE_PRECISION", "int8").lower() != "fp32"
+    backend_class = {"faiss": FaissBackend, "numpy": NumpyBackend}.get(backend)
+    if backend_class is not None:
+        store_path = os.path.join(MEMORY_STORE_PATH, name)
+        with _memory_stores_lock:
+            store = _memory_stores.get(store_path)
+            if type(store) is not backend_class or store.quantize != quantize:
+                store = backend_class(name, quantize=quantize, path=store_path)
+                _memory_stores[store_path] = store
+        return store
+
     chroma_client = chromadb.PersistentClient(path="./vectordb")
     collection = chroma_client.get_or_create_collection(name=name)
     return collection
 
 
+def embedding_providers(available):
+    """
+    Choose the ONNX Runtime execution providers for the embedding model.
+
+    Installed GPU providers come first so onnxruntime-gpu runs the model on the GPU,
+    with the CPU as fallback. Setting EMBEDDING_DEVICE to "cpu" keeps it on the CPU.
+
+    Args:
+        available (list[str]): Providers reported by onnxruntime.get_available_providers().
+
+    Returns:
+        list[str]: Providers in order of preference.
+    """
+    providers = []
+    if os.getenv("EMBEDDING_DEVICE", "auto").lower() != "cpu":
+        providers = [provider for provider in GPU_PROVIDERS if provider in available]
+    if "CPUExecutionProvider" in available:
+        providers.append("CPUExecutionProvider")
+    return providers
+
+
+@lru_cache(maxsize=1)
+def get_embedding_function():
+    """
+    Return the embedding function shared by all indexing calls.
+
+    Returns:
+        ONNXMiniLM_L6_V2: Embedding function, created once per process.
+    """
+    providers = embedding_providers(onnxruntime.get_available_providers())
+    return ONNXMiniLM_L6_V2(preferred_providers=providers or None)
+
+
+def embed_texts(texts):
+    """
+    Embed texts, reusing cached embeddings for texts that were embedded before.
+
+    Args:
+        texts (list[str]): Texts to embed.
+
+    Returns:
+        list: One float32 numpy array per text.
+    """
+    embeddings = get_embeddings(EMBEDDING_MODEL, texts)
+
+    # Only texts missing from the cache go through the embedding model
+    misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if misses:
+        miss_texts = [texts[i] for i in misses]
+        computed = get_embedding_function()(miss_texts)
+        for i, embedding in zip(misses, computed):
+            embeddings[i] = np.asarray(embedding, dtype=np.float32)
+        put_embeddings(EMBEDDING_MODEL, miss_texts, [embeddings[i] for i in misses])
+
+    return embeddings
+
+
 def add_chunks(chunks, collection):
     """
     Add document chunks to a ChromaDB collection.
 
+    Chunks from several files can be passed at once; they are written in a single
+    upsert. Embeddings are computed in one batched pass, skipping chunks whose
+    embedding is already in the embedding cache.
+
     Args:
         chunks (list[Document]): List of Document objects to add to the collection.
         collection (chromadb.Collection): The ChromaDB collection to add chunks to.
@@ -64,13 +794,17 @@ def add_chunks(chunks, collection):
     Returns:
         chromadb.Collection: The updated collection with new chunks.
     """
+    documents = [doc.page_content for doc in chunks]
+
     collection.upsert(
-        documents=[doc.page_content for doc in chunks],
-        # Generate deterministic IDs using MD5 hash of source+index
-        # This ensures same document chunks get same ID, preventing duplicates on re-indexing
+        documents=documents,
+        embeddings=embed_texts(documents),
+        # Generate deterministic IDs using MD5 hash of source+chunk index
+        # This ensures same document chunks get same ID, preventing duplicates on re-indexing.
+        # The chunk index comes from metadata so batches may mix chunks from several files.
         ids=[
-            hashlib.md5(f"{doc.metadata['source']}-{i}".encode()).hexdigest()
-            for i, doc in enumerate(chunks)
+            hashlib.md5(f"{doc.metadata['source']}-{doc.metadata['chunk']}".encode()).hexdigest()
+            for doc in chunks
         ],
         metadatas=[doc.metadata for doc in chunks],
     )
@@ -88,16 +822,10 @@ def create_file_index_chunk(files):
     Returns:
         list[Document]: List of Document objects containing file index information.
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50,
-        separators=["\n\n", "\n", " ", ""],
-    )
-
     # Normalize paths to use forward slashes to avoid escape character issues
     normalized_files = [file.replace("\\", "/") for file in files]
     text = "The following files were indexed:\n" + "\n".join(normalized_files)
-    chunks = splitter.split_text(text)
+    chunks = _file_index_splitter.split_text(text)
 
     docs = [
         Document(page_content=c, metadata={"source": "indexing files", "chunk": i})
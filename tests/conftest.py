@@ -0,0 +1,62 @@
+# type: ignore
+
+"""
+Shared test fakes and fixtures
+
+Provides a deterministic embedding function and a minimal ChromaDB
+collection stand-in so tests run without loading the ONNX model.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import embedding_cache
+import retrieval_system
+import vector_store
+
+
+class FakeEmbeddingFunction:
+    """Deterministic embedding function that records the texts it embedded"""
+
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeCollection:
+    """Minimal stand-in for a ChromaDB collection that records upsert and query calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def upsert(self, **kwargs):
+        self.calls.append(kwargs)
+
+    def query(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+@pytest.fixture
+def fake_embedder(tmp_path, monkeypatch):
+    """Replace the embedding model, isolate the embedding cache and clear the query cache"""
+    embedder = FakeEmbeddingFunction()
+    monkeypatch.setattr(vector_store, "get_embedding_function", lambda: embedder)
+    monkeypatch.setattr(retrieval_system, "get_embedding_function", lambda: embedder)
+    monkeypatch.setattr(embedding_cache, "CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    retrieval_system._embed_query.cache_clear()
+    yield embedder
+    retrieval_system._embed_query.cache_clear()
+
+
+@pytest.fixture
+def make_collection():
+    """Return a factory for fresh fake collections"""
+    return FakeCollection
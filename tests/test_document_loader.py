@@ -13,7 +13,9 @@ from pathlib import Path
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+import document_loader
 from document_loader import load_txt, load_pdf, load_docx, load_odt
+from pypdf import PdfWriter
 
 
 class TestLoadTxt:
@@ -65,6 +67,16 @@ class TestLoadTxt:
         assert result == content
         assert result.count("\n") == 2
 
+    def test_load_large_txt_file_memory_mapped(self, tmp_path, monkeypatch):
+        """Test that memory-mapped loading matches text-mode reading, line endings included"""
+        monkeypatch.setattr(document_loader, "MMAP_THRESHOLD", 0)
+        test_file = tmp_path / "large.txt"
+        test_file.write_bytes("Caf\u00e9\r\nLine 2\rLine 3\n".encode("utf-8"))
+
+        result = load_txt(str(test_file))
+
+        assert result == "Caf\u00e9\nLine 2\nLine 3\n"
+
 
 class TestLoadPdf:
     """Test suite for PDF file loading"""
@@ -83,6 +95,20 @@ class TestLoadPdf:
 
         assert result == ""
 
+    def test_load_pdf_memory_mapped(self, tmp_path, monkeypatch):
+        """Test that a memory-mapped PDF is parsed like a regular one"""
+        monkeypatch.setattr(document_loader, "MMAP_THRESHOLD", 0)
+        pdf_file = tmp_path / "blank.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        writer.add_blank_page(width=200, height=200)
+        with open(pdf_file, "wb") as f:
+            writer.write(f)
+
+        result = load_pdf(str(pdf_file))
+
+        assert result == "\n"
+
 
 class TestLoadDocx:
     """Test suite for DOCX file loading"""
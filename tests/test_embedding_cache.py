@@ -0,0 +1,88 @@
+# type: ignore
+
+"""
+Unit tests for embedding_cache.py
+
+Tests persistent embedding storage and lookup, including model separation
+and reuse of embeddings after the in-memory layer is cleared.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import embedding_cache
+from embedding_cache import cache_key, get_embeddings, put_embeddings
+
+
+class TestEmbeddingCache:
+    """Test suite for embedding cache lookups and inserts"""
+
+    def test_missing_texts_return_none(self, tmp_path):
+        """Test that texts never stored are reported as misses"""
+        path = str(tmp_path / "cache.sqlite3")
+
+        result = get_embeddings("model", ["unknown text"], path=path)
+
+        assert result == [None]
+
+    def test_put_then_get_roundtrip(self, tmp_path):
+        """Test that stored embeddings are returned as float32 arrays"""
+        path = str(tmp_path / "cache.sqlite3")
+        put_embeddings("model", ["hello"], [[0.1, 0.2, 0.3]], path=path)
+
+        result = get_embeddings("model", ["hello", "other"], path=path)
+
+        assert result[0].dtype == np.float32
+        assert np.allclose(result[0], [0.1, 0.2, 0.3])
+        assert result[1] is None
+
+    def test_model_name_separates_entries(self, tmp_path):
+        """Test that embeddings from one model are not reused for another"""
+        path = str(tmp_path / "cache.sqlite3")
+        put_embeddings("model-a", ["hello"], [[1.0, 0.0]], path=path)
+
+        result = get_embeddings("model-b", ["hello"], path=path)
+
+        assert result == [None]
+        assert cache_key("model-a", "hello") != cache_key("model-b", "hello")
+
+    def test_embeddings_persist_without_memory_layer(self, tmp_path):
+        """Test that embeddings are read back from disk after memory is cleared"""
+        path = str(tmp_path / "cache.sqlite3")
+        put_embeddings("model", ["persisted"], [[0.5, 0.5]], path=path)
+        embedding_cache._memory.clear()
+
+        result = get_embeddings("model", ["persisted"], path=path)
+
+        assert np.allclose(result[0], [0.5, 0.5])
+
+    def test_oldest_entries_evicted_beyond_limit(self, tmp_path, monkeypatch):
+        """Test that the database keeps only the MAX_ENTRIES most recently written embeddings"""
+        path = str(tmp_path / "cache.sqlite3")
+        monkeypatch.setattr(embedding_cache, "MAX_ENTRIES", 2)
+        put_embeddings("model", ["first", "second"], [[1.0], [2.0]], path=path)
+        put_embeddings("model", ["first"], [[1.0]], path=path)
+        put_embeddings("model", ["third"], [[3.0]], path=path)
+        embedding_cache._memory.clear()
+
+        result = get_embeddings("model", ["first", "second", "third"], path=path)
+
+        assert result[1] is None
+        assert np.allclose(result[0], [1.0])
+        assert np.allclose(result[2], [3.0])
+
+
+def test_duplicate_texts_share_lookup(tmp_path):
+    """Test that repeated texts in one lookup all receive the cached embedding"""
+    path = str(tmp_path / "cache.sqlite3")
+    put_embeddings("model", ["same"], [[2.0, 3.0]], path=path)
+    embedding_cache._memory.clear()
+
+    result = get_embeddings("model", ["same", "same"], path=path)
+
+    assert np.allclose(result[0], [2.0, 3.0])
+    assert np.allclose(result[1], [2.0, 3.0])
@@ -0,0 +1,90 @@
+# type: ignore
+
+"""
+Unit tests for response_generator.py
+
+Tests how much chat history is sent to the LLM and how the history limit is
+read from the environment.
+"""
+
+import sys
+import os
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import response_generator
+from response_generator import generate_answer, read_int_setting
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Provide an LLM stand-in that records the messages of each prompt it receives"""
+    # generate_answer reads prompts/system.txt relative to the repository root
+    monkeypatch.chdir(os.path.join(os.path.dirname(__file__), ".."))
+    prompts = []
+
+    def answer(prompt_value):
+        prompts.append(prompt_value.to_messages())
+        return "stub answer"
+
+    llm = RunnableLambda(answer)
+    llm.prompts = prompts
+    return llm
+
+
+def make_history(turns):
+    """Build a chat history of alternating user and assistant messages"""
+    history = []
+    for i in range(turns):
+        history.append(HumanMessage(f"question {i}"))
+        history.append(AIMessage(f"answer {i}"))
+    return history
+
+
+class TestGenerateAnswer:
+    """Test suite for the chat history sent with each question"""
+
+    def test_only_recent_history_is_sent(self, stub_llm, monkeypatch):
+        """Test that only the last HISTORY_MAX_MESSAGES messages reach the chain"""
+        monkeypatch.setattr(response_generator, "HISTORY_MAX_MESSAGES", 4)
+
+        answer = generate_answer(stub_llm, "new question", [], make_history(5))
+
+        messages = stub_llm.prompts[0]
+        assert answer == "stub answer"
+        assert [m.content for m in messages[1:-1]] == ["question 3", "answer 3", "question 4", "answer 4"]
+        assert messages[-1].content == "new question"
+
+    def test_zero_limit_sends_full_history(self, stub_llm, monkeypatch):
+        """Test that HISTORY_MAX_MESSAGES=0 sends the whole conversation"""
+        monkeypatch.setattr(response_generator, "HISTORY_MAX_MESSAGES", 0)
+
+        generate_answer(stub_llm, "new question", [], make_history(5))
+
+        assert len(stub_llm.prompts[0]) == 1 + 10 + 1
+
+
+class TestReadIntSetting:
+    """Test suite for integer settings read from the environment"""
+
+    def test_unset_uses_default(self, monkeypatch):
+        """Test that a missing variable falls back to the default"""
+        monkeypatch.delenv("HISTORY_MAX_MESSAGES", raising=False)
+
+        assert read_int_setting("HISTORY_MAX_MESSAGES", 20) == 20
+
+    def test_valid_value(self, monkeypatch):
+        """Test that a whole number is used as is"""
+        monkeypatch.setenv("HISTORY_MAX_MESSAGES", "6")
+
+        assert read_int_setting("HISTORY_MAX_MESSAGES", 20) == 6
+
+    def test_invalid_value_uses_default(self, monkeypatch):
+        """Test that a value that is not a number falls back to the default instead of crashing"""
+        monkeypatch.setenv("HISTORY_MAX_MESSAGES", "twenty")
+
+        assert read_int_setting("HISTORY_MAX_MESSAGES", 20) == 20
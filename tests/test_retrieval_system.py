@@ -0,0 +1,43 @@
+# type: ignore
+
+"""
+Unit tests for retrieval_system.py
+
+Tests that queries are embedded once per distinct text and passed to the
+collection as precomputed embeddings.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from retrieval_system import query_documents
+
+
+class TestQueryDocuments:
+    """Test suite for document querying"""
+
+    def test_query_passes_embeddings(self, fake_embedder, make_collection):
+        """Test that the collection receives a precomputed query embedding"""
+        collection = make_collection()
+
+        query_documents(collection, "What is this?", n_results=3)
+
+        call = collection.calls[0]
+        assert "query_texts" not in call
+        assert list(call["query_embeddings"][0]) == [13.0, 1.0]
+        assert call["n_results"] == 3
+
+    def test_repeated_query_embedded_once(self, fake_embedder, make_collection):
+        """Test that asking the same question twice reuses the cached embedding"""
+        collection = make_collection()
+
+        query_documents(collection, "Same question")
+        query_documents(collection, "Same question")
+        query_documents(collection, "Different question")
+
+        assert fake_embedder.embedded == ["Same question", "Different question"]
+        assert len(collection.calls) == 3
@@ -4,7 +4,8 @@
 Unit tests for utils.py
 
 Tests the sanitize_filename function to ensure filenames are properly
-sanitized for cross-platform compatibility and storage system constraints.
+sanitized for cross-platform compatibility and storage system constraints,
+and that Streamlit Cloud detection is cached.
 """
 
 import pytest
@@ -13,7 +14,8 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from utils import sanitize_filename
+import utils
+from utils import sanitize_filename, is_streamlit_cloud
 
 
 class TestSanitizeFilename:
@@ -91,3 +93,17 @@ def test_sanitize_preserves_numbers():
     filename = "report2024_v2.pdf"
     result = sanitize_filename(filename)
     assert result == "report2024_v2.pdf"
+
+
+def test_is_streamlit_cloud_checks_environment_once(monkeypatch):
+    """Test that the environment is inspected once and the result reused"""
+    calls = []
+    monkeypatch.delenv("STREAMLIT_SERVER_ROOT_URL", raising=False)
+    monkeypatch.setattr(utils.socket, "gethostname", lambda: calls.append(1) or "my-streamlit-host")
+    is_streamlit_cloud.cache_clear()
+    try:
+        assert is_streamlit_cloud() is True
+        assert is_streamlit_cloud() is True
+        assert len(calls) == 1
+    finally:
+        is_streamlit_cloud.cache_clear()
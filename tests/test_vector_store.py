@@ -9,10 +9,29 @@ including metadata generation and document splitting logic.
 
 import sys
 import os
+import json
+
+import numpy as np
+import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from vector_store import chunk_text, create_file_index_chunk
+import vector_store
+from vector_store import (
+    chunk_text,
+    chunk_texts,
+    create_file_index_chunk,
+    add_chunks,
+    create_collection,
+    embedding_providers,
+    file_fingerprint,
+    existing_fingerprints,
+    top_k_cosine,
+    top_k_cosine_int8,
+    quantize_int8,
+    FaissBackend,
+    NumpyBackend,
+)
 from langchain.schema import Document
 
 
@@ -74,6 +93,52 @@ class TestChunkText:
 
         assert isinstance(result, list)
 
+    def test_chunks_overlap_and_keep_original_text(self):
+        """Test that consecutive chunks overlap and are exact slices of the input"""
+        text = " ".join(f"Word{i}, value." for i in range(200))
+
+        result = chunk_text(text, "test.txt")
+        contents = [doc.page_content.split("\n\n", 1)[1] for doc in result]
+
+        assert len(contents) > 1
+        assert all(content in text for content in contents)
+        assert contents[0].split()[-1] in contents[1]
+        assert contents[-1].endswith("Word199, value.")
+
+    def test_chunk_text_without_separators_is_capped(self):
+        """Test that a single unbroken token is split into chunks of at most CHUNK_MAX_CHARS"""
+        text = "x" * 20000
+
+        result = chunk_text(text, "b.txt")
+        contents = [doc.page_content.split("\n\n", 1)[1] for doc in result]
+
+        assert all(len(content) <= vector_store.CHUNK_MAX_CHARS for content in contents)
+        assert "".join(contents) == text
+
+    def test_chunk_long_tokens_are_capped(self):
+        """Test that windows of long tokens end at the character cap and still overlap"""
+        text = " ".join(f"https://example.com/{i}/" + "a" * 150 for i in range(50))
+
+        result = chunk_text(text, "urls.txt")
+        contents = [doc.page_content.split("\n\n", 1)[1] for doc in result]
+
+        assert all(len(content) <= vector_store.CHUNK_MAX_CHARS for content in contents)
+        assert contents[0].split()[-1] in contents[1]
+        assert contents[-1].endswith("https://example.com/49/" + "a" * 150)
+
+    def test_chunk_whitespace_only_text(self):
+        """Test that text without any tokens produces no chunks"""
+        result = chunk_text("   \n\n  ", "blank.txt")
+
+        assert result == []
+
+    def test_chunk_stores_fingerprint_in_metadata(self):
+        """Test that a file fingerprint is recorded on every chunk"""
+        result = chunk_text("Sentence. " * 100, "test.txt", ("test.txt", 123, 45))
+
+        assert all(doc.metadata["mtime_ns"] == 123 for doc in result)
+        assert all(doc.metadata["size"] == 45 for doc in result)
+
     def test_chunk_text_with_newlines(self):
         """Test that chunking respects paragraph boundaries"""
         text = "Paragraph 1\n\nParagraph 2\n\nParagraph 3"
@@ -83,6 +148,39 @@ class TestChunkText:
         assert isinstance(result[0], Document)
 
 
+class TestChunkTexts:
+    """Test suite for batch chunking of several documents"""
+
+    def test_batch_matches_single_document_chunking(self):
+        """Test that chunking in bulk gives the same chunks as one document at a time"""
+        texts = ["Sentence. " * 150, "Short text.", "", "Word " * 400]
+        files = ["a.txt", "b.txt", "c.txt", "d.txt"]
+
+        batched = chunk_texts(texts, files)
+        single = [doc for text, file in zip(texts, files) for doc in chunk_text(text, file)]
+
+        assert [doc.page_content for doc in batched] == [doc.page_content for doc in single]
+        assert [doc.metadata for doc in batched] == [doc.metadata for doc in single]
+
+    def test_batch_stores_each_fingerprint(self):
+        """Test that each document's chunks carry its own fingerprint"""
+        result = chunk_texts(["One.", "Two."], ["a.txt", "b.txt"], [("a.txt", 1, 2), ("b.txt", 3, 4)])
+
+        assert [(doc.metadata["source"], doc.metadata["mtime_ns"]) for doc in result] == [
+            ("a.txt", 1),
+            ("b.txt", 3),
+        ]
+
+    def test_window_count_covers_every_token(self):
+        """Test that the last window ends at the last token without an extra tail window"""
+        text = " ".join(f"w{i}" for i in range(vector_store.CHUNK_TOKENS + 1))
+
+        result = chunk_text(text, "t.txt")
+
+        assert len(result) == 2
+        assert result[-1].page_content.endswith(f"w{vector_store.CHUNK_TOKENS}")
+
+
 class TestCreateFileIndexChunk:
     """Test suite for file index chunk creation"""
 
@@ -148,6 +246,478 @@ class TestCreateFileIndexChunk:
         assert "file99.txt" in all_content
 
 
+@pytest.mark.usefixtures("fake_embedder")
+class TestAddChunks:
+    """Test suite for batched chunk insertion"""
+
+    def test_add_chunks_single_upsert_for_many_files(self, make_collection):
+        """Test that chunks from several files are written in one upsert call"""
+        chunks = chunk_text("First file.", "a.txt") + chunk_text("Second file.", "b.txt")
+        collection = make_collection()
+
+        add_chunks(chunks, collection)
+
+        assert len(collection.calls) == 1
+        assert len(collection.calls[0]["ids"]) == 2
+
+    def test_add_chunks_ids_independent_of_batch_position(self, make_collection):
+        """Test that chunk IDs depend on source and chunk index, not batch position"""
+        chunks = chunk_text("Sentence. " * 100, "a.txt")
+        alone = make_collection()
+        batched = make_collection()
+
+        add_chunks(chunks, alone)
+        add_chunks(chunk_text("Other file.", "b.txt") + chunks, batched)
+
+        assert set(alone.calls[0]["ids"]) <= set(batched.calls[0]["ids"])
+        assert len(set(batched.calls[0]["ids"])) == len(chunks) + 1
+
+    def test_add_chunks_reuses_cached_embeddings(self, fake_embedder, make_collection):
+        """Test that re-adding the same chunks does not call the embedding model again"""
+        chunks = chunk_text("Cached content.", "cached.txt")
+
+        add_chunks(chunks, make_collection())
+        add_chunks(chunks, make_collection())
+
+        assert len(fake_embedder.embedded) == len(chunks)
+
+
+@pytest.fixture(params=["numpy", "numpy-int8", "faiss", "faiss-int8"])
+def open_backend(request):
+    """Provide a function opening each in-memory backend, skipping FAISS when not installed"""
+    quantize = request.param.endswith("int8")
+    backend_class = NumpyBackend
+    if request.param.startswith("faiss"):
+        pytest.importorskip("faiss")
+        backend_class = FaissBackend
+    return lambda path=None: backend_class("test", quantize=quantize, path=path)
+
+
+@pytest.fixture
+def memory_backend(open_backend):
+    """Provide each in-memory vector store backend without persistence"""
+    return open_backend()
+
+
+class TestMemoryBackends:
+    """Test suite for the in-memory vector stores"""
+
+    def test_query_returns_closest_chunk_first(self, memory_backend):
+        """Test that results are ordered by cosine similarity"""
+        backend = memory_backend
+        backend.upsert(
+            ids=["a", "b"],
+            embeddings=[[1.0, 0.0], [0.0, 2.0]],
+            documents=["doc a", "doc b"],
+            metadatas=[{"source": "a.txt"}, {"source": "b.txt"}],
+        )
+
+        result = backend.query(query_embeddings=[[0.1, 1.0]], n_results=2)
+
+        assert result["ids"] == [["b", "a"]]
+        assert result["documents"][0][0] == "doc b"
+        assert result["metadatas"][0][0] == {"source": "b.txt"}
+        assert result["distances"][0][0] < result["distances"][0][1]
+
+    def test_upsert_replaces_existing_ids(self, memory_backend):
+        """Test that re-adding an ID replaces its document instead of duplicating it"""
+        backend = memory_backend
+        backend.upsert(ids=["a"], embeddings=[[1.0, 0.0]], documents=["old"], metadatas=[{}])
+        backend.upsert(ids=["b"], embeddings=[[0.0, 1.0]], documents=["other"], metadatas=[{}])
+        backend.upsert(ids=["a"], embeddings=[[1.0, 0.0]], documents=["new"], metadatas=[{}])
+
+        result = backend.query(query_embeddings=[[1.0, 0.0]], n_results=5)
+
+        assert backend.count() == 2
+        assert result["ids"] == [["a", "b"]]
+        assert result["documents"][0][0] == "new"
+
+    def test_query_empty_store(self, memory_backend):
+        """Test that querying an empty store returns empty result lists"""
+        result = memory_backend.query(query_embeddings=[[1.0, 0.0]], n_results=5)
+
+        assert result["ids"] == [[]]
+        assert result["documents"] == [[]]
+
+    def test_delete_by_source(self, memory_backend):
+        """Test that deleting by source removes only that file's chunks"""
+        backend = memory_backend
+        backend.upsert(
+            ids=["a0", "a1", "b0"],
+            embeddings=[[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]],
+            documents=["a0", "a1", "b0"],
+            metadatas=[{"source": "a.txt"}, {"source": "a.txt"}, {"source": "b.txt"}],
+        )
+
+        backend.delete(where={"source": "a.txt"})
+        result = backend.query(query_embeddings=[[1.0, 0.0]], n_results=5)
+
+        assert backend.count() == 1
+        assert result["ids"] == [["b0"]]
+        assert backend.get(include=["metadatas"])["metadatas"] == [{"source": "b.txt"}]
+
+    def test_delete_with_in_operator(self, memory_backend):
+        """Test that {"$in": [...]} deletes the chunks of several sources in one call"""
+        backend = memory_backend
+        backend.upsert(
+            ids=["a0", "b0", "c0"],
+            embeddings=[[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]],
+            documents=["a0", "b0", "c0"],
+            metadatas=[{"source": "a.txt"}, {"source": "b.txt"}, {"source": "c.txt"}],
+        )
+
+        backend.delete(where={"source": {"$in": ["a.txt", "c.txt"]}})
+
+        assert backend.get()["ids"] == ["b0"]
+
+    def test_many_batches(self, memory_backend):
+        """Test that repeated batch inserts keep every vector searchable"""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(3000, 8)).astype(np.float32)
+        for start in range(0, len(vectors), 256):
+            batch = vectors[start : start + 256]
+            ids = [str(i) for i in range(start, start + len(batch))]
+            memory_backend.upsert(ids=ids, embeddings=batch, documents=ids, metadatas=[{}] * len(batch))
+
+        result = memory_backend.query(query_embeddings=[vectors[2999]], n_results=1)
+
+        assert memory_backend.count() == 3000
+        assert result["ids"] == [["2999"]]
+
+
+class TestPersistedBackends:
+    """Test suite for in-memory vector stores persisted to disk"""
+
+    def test_reopen_restores_entries(self, open_backend, tmp_path):
+        """Test that a reopened store returns the same results as the original"""
+        backend = open_backend(str(tmp_path))
+        backend.upsert(
+            ids=["a", "b"],
+            embeddings=[[1.0, 0.0], [0.0, 2.0]],
+            documents=["doc a", "doc b"],
+            metadatas=[{"source": "a.txt"}, {"source": "b.txt"}],
+        )
+        backend.upsert(ids=["c"], embeddings=[[1.0, 1.0]], documents=["doc c"], metadatas=[{}])
+        expected = backend.query(query_embeddings=[[0.1, 1.0]], n_results=3)
+
+        reopened = open_backend(str(tmp_path))
+
+        assert reopened.count() == 3
+        assert reopened.get()["metadatas"] == [{"source": "a.txt"}, {"source": "b.txt"}, {}]
+        assert reopened.query(query_embeddings=[[0.1, 1.0]], n_results=3)["ids"] == expected["ids"]
+
+    def test_reopen_after_delete_and_replace(self, open_backend, tmp_path):
+        """Test that deletions and replaced IDs are persisted"""
+        backend = open_backend(str(tmp_path))
+        backend.upsert(
+            ids=["a0", "a1", "b0"],
+            embeddings=[[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]],
+            documents=["a0", "a1", "b0"],
+            metadatas=[{"source": "a.txt"}, {"source": "a.txt"}, {"source": "b.txt"}],
+        )
+        backend.delete(where={"source": "a.txt"})
+        backend.upsert(ids=["b0"], embeddings=[[1.0, 0.0]], documents=["new b0"], metadatas=[{}])
+
+        reopened = open_backend(str(tmp_path))
+        result = reopened.query(query_embeddings=[[1.0, 0.0]], n_results=5)
+
+        assert reopened.count() == 1
+        assert result["documents"] == [["new b0"]]
+        assert result["distances"][0][0] == pytest.approx(0.0, abs=0.01)
+
+    def test_reopened_store_accepts_new_entries(self, open_backend, tmp_path):
+        """Test that entries added after reopening are persisted after the loaded ones"""
+        open_backend(str(tmp_path)).upsert(
+            ids=["a"], embeddings=[[1.0, 0.0]], documents=["a"], metadatas=[{}]
+        )
+        reopened = open_backend(str(tmp_path))
+        reopened.upsert(ids=["b"], embeddings=[[0.0, 1.0]], documents=["b"], metadatas=[{}])
+
+        result = open_backend(str(tmp_path)).query(query_embeddings=[[0.0, 1.0]], n_results=2)
+
+        assert result["ids"] == [["b", "a"]]
+
+    def test_interrupted_write_is_discarded(self, open_backend, tmp_path):
+        """Test that rows written after the last recorded count are dropped on reopen"""
+        open_backend(str(tmp_path)).upsert(
+            ids=["a"], embeddings=[[1.0, 0.0]], documents=["a"], metadatas=[{}]
+        )
+        # Simulate an append that stopped before meta.json was updated
+        with open(tmp_path / "emb.f32", "ab") as f:
+            f.write(np.array([0.0, 1.0], dtype=np.float32).tobytes())
+        with open(tmp_path / "entries.jsonl", "a") as f:
+            f.write(json.dumps({"id": "junk", "document": "junk", "metadata": {}}) + "\n")
+
+        backend = open_backend(str(tmp_path))
+        backend.upsert(ids=["c"], embeddings=[[0.6, 0.8]], documents=["c"], metadatas=[{}])
+        reopened = open_backend(str(tmp_path))
+
+        assert reopened.get()["ids"] == ["a", "c"]
+        assert reopened.query(query_embeddings=[[0.6, 0.8]], n_results=1)["ids"] == [["c"]]
+
+    def test_store_layout(self, tmp_path):
+        """Test that embeddings are stored as one contiguous float32 array"""
+        backend = NumpyBackend("test", path=str(tmp_path))
+        backend.upsert(
+            ids=["a", "b"], embeddings=[[3.0, 4.0], [0.0, 1.0]], documents=["a", "b"], metadatas=[{}, {}]
+        )
+
+        stored = np.fromfile(tmp_path / "emb.f32", dtype=np.float32).reshape(2, 2)
+
+        assert json.loads((tmp_path / "meta.json").read_text()) == {"count": 2, "dim": 2, "deleted": []}
+        assert np.allclose(stored, [[0.6, 0.8], [0.0, 1.0]])
+
+    def test_delete_records_rows_without_rewriting(self, open_backend, tmp_path):
+        """Test that deleting a minority of rows only marks them deleted in meta.json"""
+        backend = open_backend(str(tmp_path))
+        backend.upsert(
+            ids=["a", "b", "c"],
+            embeddings=[[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]],
+            documents=["a", "b", "c"],
+            metadatas=[{"source": "a.txt"}, {"source": "b.txt"}, {"source": "c.txt"}],
+        )
+        size = os.path.getsize(tmp_path / "emb.f32")
+
+        backend.delete(where={"source": "b.txt"})
+        reopened = open_backend(str(tmp_path))
+
+        assert os.path.getsize(tmp_path / "emb.f32") == size
+        assert json.loads((tmp_path / "meta.json").read_text())["deleted"] == [1]
+        assert reopened.get()["ids"] == ["a", "c"]
+        assert reopened.query(query_embeddings=[[0.0, 1.0]], n_results=1)["ids"] == [["c"]]
+
+    def test_store_compacted_when_most_rows_deleted(self, open_backend, tmp_path):
+        """Test that the store files are rewritten once deleted rows outnumber live ones"""
+        backend = open_backend(str(tmp_path))
+        backend.upsert(
+            ids=["a", "b", "c"],
+            embeddings=[[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]],
+            documents=["a", "b", "c"],
+            metadatas=[{"source": "a.txt"}, {"source": "b.txt"}, {"source": "c.txt"}],
+        )
+
+        backend.delete(where={"source": {"$in": ["a.txt", "c.txt"]}})
+        reopened = open_backend(str(tmp_path))
+
+        assert os.path.getsize(tmp_path / "emb.f32") == 2 * 4
+        assert json.loads((tmp_path / "meta.json").read_text())["deleted"] == []
+        assert reopened.get()["ids"] == ["b"]
+        assert reopened.query(query_embeddings=[[0.0, 1.0]], n_results=1)["documents"] == [["b"]]
+
+    def test_two_handles_on_one_path(self, open_backend, tmp_path):
+        """Test that writes through two handles on one store both survive, rows paired correctly"""
+        first = open_backend(str(tmp_path))
+        second = open_backend(str(tmp_path))
+
+        first.upsert(ids=["a"], embeddings=[[1.0, 0.0]], documents=["doc a"], metadatas=[{}])
+        second.upsert(ids=["b"], embeddings=[[0.0, 1.0]], documents=["doc b"], metadatas=[{}])
+        first.upsert(ids=["c"], embeddings=[[0.6, 0.8]], documents=["doc c"], metadatas=[{}])
+        second.delete(where={"source": "missing.txt"})
+
+        reopened = open_backend(str(tmp_path))
+        result = reopened.query(query_embeddings=[[0.0, 1.0]], n_results=1)
+
+        assert reopened.get()["ids"] == ["a", "b", "c"]
+        assert result["documents"] == [["doc b"]]
+        assert result["distances"][0][0] == pytest.approx(0.0, abs=0.01)
+
+    def test_float32_store_is_memory_mapped(self, tmp_path):
+        """Test that a reopened float32 numpy store searches the memory-mapped file"""
+        NumpyBackend("test", path=str(tmp_path)).upsert(
+            ids=["a"], embeddings=[[1.0, 0.0]], documents=["a"], metadatas=[{}]
+        )
+
+        reopened = NumpyBackend("test", path=str(tmp_path))
+
+        assert isinstance(reopened.matrix, np.memmap)
+
+    def test_missing_store_opens_empty(self, open_backend, tmp_path):
+        """Test that opening a store directory that does not exist yet gives an empty store"""
+        backend = open_backend(str(tmp_path / "missing"))
+
+        assert backend.count() == 0
+        assert not os.path.exists(tmp_path / "missing")
+
+
+class TestFingerprints:
+    """Test suite for incremental indexing fingerprints"""
+
+    def test_fingerprint_changes_with_content(self, tmp_path):
+        """Test that rewriting a file with different size changes its fingerprint"""
+        test_file = tmp_path / "doc.txt"
+        test_file.write_text("first")
+        before = file_fingerprint(str(test_file))
+
+        test_file.write_text("second version")
+        after = file_fingerprint(str(test_file))
+
+        assert before[0] == after[0]
+        assert before != after
+
+    def test_fingerprint_missing_file(self):
+        """Test that a missing file gets a zero fingerprint instead of an error"""
+        assert file_fingerprint("missing\\file.txt") == ("missing/file.txt", 0, 0)
+
+    def test_existing_fingerprints_reads_chunk_metadata(self):
+        """Test that fingerprints are collected from stored chunk metadata"""
+        backend = NumpyBackend("test")
+        chunks = chunk_text("Some content.", "a.txt", ("a.txt", 10, 20))
+        chunks += create_file_index_chunk(["a.txt"])
+        backend.upsert(
+            ids=[str(i) for i in range(len(chunks))],
+            embeddings=[[1.0, 0.0]] * len(chunks),
+            documents=[doc.page_content for doc in chunks],
+            metadatas=[doc.metadata for doc in chunks],
+        )
+
+        assert existing_fingerprints(backend) == {("a.txt", 10, 20), ("indexing files", None, None)}
+
+    def test_existing_fingerprints_marks_unfingerprinted_sources_changed(self):
+        """Test that sources with chunks lacking or disagreeing on fingerprints never match a file"""
+        backend = NumpyBackend("test")
+        backend.upsert(
+            ids=["old0", "old1", "mixed0", "mixed1"],
+            embeddings=[[1.0, 0.0]] * 4,
+            documents=["old0", "old1", "mixed0", "mixed1"],
+            metadatas=[
+                {"source": "old.txt", "chunk": 0},
+                {"source": "old.txt", "chunk": 1},
+                {"source": "mixed.txt", "mtime_ns": 1, "size": 2, "chunk": 0},
+                {"source": "mixed.txt", "mtime_ns": 3, "size": 4, "chunk": 1},
+            ],
+        )
+
+        assert existing_fingerprints(backend) == {("old.txt", None, None), ("mixed.txt", None, None)}
+
+
+def test_top_k_cosine_matches_full_sort():
+    """Test that partial selection returns the same ranking as a full sort"""
+    rng = np.random.default_rng(1)
+    matrix = rng.normal(size=(500, 16)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = matrix[:2] + 0.1
+
+    scores, positions = top_k_cosine(matrix, query, 5)
+
+    expected = np.argsort(-(query @ matrix.T), axis=1)[:, :5]
+    assert positions.tolist() == expected.tolist()
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_top_k_cosine_all_rows():
+    """Test that asking for every row returns all rows in similarity order"""
+    matrix = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], dtype=np.float32)
+
+    scores, positions = top_k_cosine(matrix, np.array([[0.0, 1.0]], dtype=np.float32), 3)
+
+    assert positions.tolist() == [[1, 2, 0]]
+
+
+def test_quantize_int8_roundtrip():
+    """Test that int8 codes with per-vector scales reconstruct the input closely"""
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(10, 32)).astype(np.float32)
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8
+    assert np.abs(codes).max() == 127
+    assert np.allclose(codes / scales[:, None], vectors, atol=np.abs(vectors).max() / 127)
+
+
+def test_top_k_cosine_int8_matches_float_ranking():
+    """Test that quantized search finds the same nearest rows as float32 search"""
+    rng = np.random.default_rng(3)
+    matrix = rng.normal(size=(10000, 64)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    queries = matrix[[5, 9000]]
+    codes, scales = quantize_int8(matrix)
+
+    _, positions = top_k_cosine_int8(codes, scales, queries, 1)
+
+    assert positions.tolist() == [[5], [9000]]
+
+
+def test_normalize_scales_rows_and_keeps_zero_rows():
+    """Test that rows become unit length and all-zero rows stay zero"""
+    result = vector_store._normalize([[3.0, 4.0], [0.0, 0.0]])
+
+    assert result.dtype == np.float32
+    assert result.flags["C_CONTIGUOUS"]
+    assert np.allclose(result, [[0.6, 0.8], [0.0, 0.0]])
+
+
+class TestCreateCollection:
+    """Test suite for vector store backend selection"""
+
+    @pytest.fixture(autouse=True)
+    def store_path(self, tmp_path, monkeypatch):
+        """Keep in-memory stores out of the working directory"""
+        monkeypatch.setattr(vector_store, "MEMORY_STORE_PATH", str(tmp_path))
+        return tmp_path
+
+    def test_create_collection_selects_numpy(self, monkeypatch):
+        """Test that VSTORE_BACKEND=numpy returns a numpy backend"""
+        monkeypatch.setenv("VSTORE_BACKEND", "numpy")
+
+        collection = create_collection("some/folder")
+
+        assert isinstance(collection, NumpyBackend)
+        assert collection.quantize
+
+    def test_create_collection_fp32_precision(self, monkeypatch):
+        """Test that VSTORE_PRECISION=fp32 disables quantization"""
+        monkeypatch.setenv("VSTORE_BACKEND", "numpy")
+        monkeypatch.setenv("VSTORE_PRECISION", "fp32")
+
+        collection = create_collection("some/folder")
+
+        assert not collection.quantize
+
+    def test_create_collection_selects_faiss(self, monkeypatch):
+        """Test that VSTORE_BACKEND=faiss returns a FAISS backend"""
+        pytest.importorskip("faiss")
+        monkeypatch.setenv("VSTORE_BACKEND", "faiss")
+
+        collection = create_collection("some/folder")
+
+        assert isinstance(collection, FaissBackend)
+        assert collection.name == "some_folder"
+
+    def test_create_collection_shares_memory_store(self, monkeypatch):
+        """Test that sessions opening the same folder get the same in-memory store"""
+        monkeypatch.setenv("VSTORE_BACKEND", "numpy")
+
+        first = create_collection("some/folder")
+        second = create_collection("some/folder")
+
+        assert first is second
+        assert create_collection("other/folder") is not first
+
+    def test_create_collection_persists_memory_backend(self, monkeypatch, store_path):
+        """Test that in-memory backends are stored in a directory named after the collection"""
+        monkeypatch.setenv("VSTORE_BACKEND", "numpy")
+
+        collection = create_collection("some/folder")
+
+        assert collection.path == os.path.join(str(store_path), "some_folder")
+
+
+def test_embedding_providers_prefer_gpu(monkeypatch):
+    """Test that GPU providers are tried before the CPU and unsupported ones are dropped"""
+    monkeypatch.delenv("EMBEDDING_DEVICE", raising=False)
+    available = ["AzureExecutionProvider", "CPUExecutionProvider", "CUDAExecutionProvider"]
+
+    assert embedding_providers(available) == ["CUDAExecutionProvider", "CPUExecutionProvider"]
+
+
+def test_embedding_providers_cpu_only(monkeypatch):
+    """Test that EMBEDDING_DEVICE=cpu keeps the model on the CPU"""
+    monkeypatch.setenv("EMBEDDING_DEVICE", "cpu")
+
+    assert embedding_providers(["CUDAExecutionProvider", "CPUExecutionProvider"]) == ["CPUExecutionProvider"]
+
+
 def test_chunk_text_realistic_document():
     """Test chunking multi-section document with realistic structure"""
     text = """